@@ -2,13 +2,13 @@
 # coding: utf-8
 
 import os
-import glob
 from pathlib import Path
 import xlsxwriter
 import traceback
 
 import sys
 from typing import List, Optional, Tuple
+import numpy as np
 import pandas as pd
 import warnings
 
@@ -19,13 +19,36 @@ curr_path = os.getcwd()
 sys.path.append(os.path.join(curr_path, "python_program"))
 
 import config
+import memory_diet
+import summary_engine
 import utils
+import work_events
+from archive_store import ArchiveStore, CompactedFile
+from datasheet_store import DatasheetStore
+from date_manifest import DateRangeManifest
+from file_catalog import FileCatalog
+from parse_cache import ParseCache
+from schema_registry import SchemaRegistry
+from staff_dictionary import StaffDictionary
+from spill_store import SpillStore
+
+
+MONTH_WISE_KEYS = [
+    "photographers_items",
+    "photostackers_rename",
+    "photostackers_adjust",
+    "photostackers_photostack",
+    "retouchers_transfer",
+    "retouchers_retouched",
+    "retouchers_variance",
+]
+MONTH_WISE_ROLES = [work_events.ROLE_PHOTOGRAPHER] + [work_events.ROLE_PHOTOSTACKER] * 3 + [work_events.ROLE_RETOUCHER] * 3
 
 
 class KPIDataProcessor:
     """Main class for processing KPI data from jobsheet exports"""
 
-    def __init__(self):
+    def __init__(self, datasheet_store: Optional[DatasheetStore] = None):
         self.curr_path = os.getcwd()
         self.parent_path = Path().resolve().parent
         self.python_errors_list = []
@@ -43,10 +66,29 @@ class KPIDataProcessor:
         self.df_catg_ppj = None
         self.df_output_sheet_names = None
         self.df_user_input = None
+        self.file_catalog = FileCatalog()
+        self.schema_registry = SchemaRegistry(config.COLS_TO_EXPECT_IN_CSV)
+        # only a long running process passes its own store in, a one-off run drops the chunks once combined
+        self.datasheet_store = datasheet_store if datasheet_store is not None else DatasheetStore()
+        self.keep_datasheets = datasheet_store is not None
+        self.spill_store = None
+        self.month_wise_tables = None
+        self.source_files: List[str] = []
+        self.staff_dictionary = StaffDictionary()
+        self.project_table: Optional[pd.DataFrame] = None
+        self.work_events: Optional[pd.DataFrame] = None
 
         self._setup_file_paths()
         self._load_configuration_data()
 
+        self.read_schema = utils.build_read_schema() if config.USE_READ_SCHEMA else None
+        self.csv_read_engine = config.CSV_READ_ENGINE
+        reader_key = utils.get_reader_key(self.read_schema, self.csv_read_engine)
+        self.dtype_backend = "pyarrow" if self.csv_read_engine == "pyarrow" else None
+        self.parse_cache = ParseCache(self.parse_cache_folder_path, reader_key, self.dtype_backend) if config.USE_PARSE_CACHE else None
+        self.archive_store = ArchiveStore(self.archive_store_folder_path, reader_key, self.dtype_backend) if config.USE_ARCHIVE_STORE else None
+        self.date_manifest = DateRangeManifest(self.date_manifest_filepath) if config.USE_DATE_RANGE_PRUNING else None
+
     def _setup_file_paths(self):
         """Initialize file paths for errors and warnings"""
         self.input_excel_path = os.path.join(self.curr_path, config.INPUT_UI_FILENAME)
@@ -69,6 +111,48 @@ class KPIDataProcessor:
             config.AGGREGATED_DATASHEET_OUTPUT_FILENAME,
         )
 
+        self.config_sheets_cache_filepath = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.CONFIG_SHEETS_CACHE_FILENAME,
+        )
+
+        self.parse_cache_folder_path = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.PARSE_CACHE_FOLDER_NAME,
+        )
+
+        self.archive_store_folder_path = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.ARCHIVE_STORE_FOLDER_NAME,
+        )
+
+        self.spill_folder_path = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.SPILL_FOLDER_NAME,
+        )
+
+        self.date_manifest_filepath = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.DATE_MANIFEST_FILENAME,
+        )
+
+        self.memory_report_filepath = os.path.join(
+            self.curr_path,
+            config.PYTHON_CODES_FOLDER_NAME,
+            config.INTERMEDIATE_FOLDER_NAME,
+            config.MEMORY_REPORT_FILENAME,
+        )
+
         self._validate_datasheet_folder()
 
     def _validate_datasheet_folder(self) -> str:
@@ -84,25 +168,32 @@ class KPIDataProcessor:
         """Load all required configuration data from Excel files"""
         print("Loading configuration data...")
 
-        # Read staff expected KPI sheet
-        df_staff_exp_kpi, errors = utils.read_excel_file(self.input_excel_path, config.STAFF_EXPECTED_KPI_SHEETNAME)
-        self.python_errors_list.extend(errors)
-        self.df_staff_exp_kpi = df_staff_exp_kpi
+        sheet_names = [
+            config.STAFF_EXPECTED_KPI_SHEETNAME,
+            config.CATEGORY_PPJ_SHEETNAME,
+            config.OUTPUT_SHEETNAMES,
+            config.DATE_INPUT_SHEETNAME,
+        ]
+        engine = utils.get_excel_reader_engine(config.EXCEL_READER_ENGINE)
 
-        # Read Category Points per Job (PPJ)
-        df_catg_ppj, errors = utils.read_excel_file(self.input_excel_path, config.CATEGORY_PPJ_SHEETNAME)
+        # Open the workbook once for all the sheets, or reuse the cached sheets if it hasn't changed
+        if config.USE_CONFIG_SHEETS_CACHE:
+            sheets, errors = utils.read_excel_sheets_cached(self.input_excel_path, sheet_names, self.config_sheets_cache_filepath, engine)
+        else:
+            sheets, errors = utils.read_excel_sheets(self.input_excel_path, sheet_names, engine)
         self.python_errors_list.extend(errors)
-        self.df_catg_ppj = df_catg_ppj
 
-        # Read output sheet names
-        df_output_sheets, errors = utils.read_excel_file(self.input_excel_path, sheet_name=config.OUTPUT_SHEETNAMES)
-        self.python_errors_list.extend(errors)
-        self.df_output_sheet_names = df_output_sheets
+        # Staff expected KPI sheet
+        self.df_staff_exp_kpi = sheets[config.STAFF_EXPECTED_KPI_SHEETNAME]
 
-        # Read date inputs
-        user_input_df, errors = utils.read_excel_file(self.input_excel_path, sheet_name=config.DATE_INPUT_SHEETNAME)
-        self.python_errors_list.extend(errors)
-        self.df_user_input = user_input_df
+        # Category Points per Job (PPJ)
+        self.df_catg_ppj = sheets[config.CATEGORY_PPJ_SHEETNAME]
+
+        # Output sheet names
+        self.df_output_sheet_names = sheets[config.OUTPUT_SHEETNAMES]
+
+        # Date inputs
+        self.df_user_input = sheets[config.DATE_INPUT_SHEETNAME]
 
     def validate_archives_folder(self) -> bool:
         """Validate that the archives folder exists"""
@@ -134,51 +225,338 @@ class KPIDataProcessor:
         self.include_archives = include_archives == "y"
         self.include_overall = include_overall == "y"
 
-    def load_main_data_files(self) -> Tuple[pd.DataFrame, List[int], List[str]]:
-        """Load and process main KPI data files"""
-        all_kpi_files = glob.glob(os.path.join(self.datasheet_folder_path, "*.csv"))
+    def get_main_data_files(self) -> List[str]:
+        """Find the main KPI data files and filter out duplicates, conflicted and template files"""
+        all_kpi_files = self.file_catalog.scan_folder(self.datasheet_folder_path, config.DATA_FILE_EXTENSIONS)
         print(f'Found {len(all_kpi_files)} KPI file(s) in "{self.datasheet_folder_path}" ...\n')
 
         # Filter files
         print("Filtering files like duplicates, conflicted, jobsheets ...")
-        remaining_kpi_files, file_warnings = utils.filter_data_files(all_kpi_files)
+        remaining_kpi_files, file_warnings = utils.filter_data_files(all_kpi_files, self.file_catalog)
         print(f"Remained {len(remaining_kpi_files)} KPI file(s)")
 
         self.python_warnings_list.extend(file_warnings)
         if self.python_warnings_list:
             utils.write_to_file(self.python_warnings_filepath, self.python_warnings_list)
 
-        # Read data files
-        print(f"Reading remaining {len(remaining_kpi_files)} files ...")
-        df, errors, warnings, df_lens, df_src_filenames = utils.read_data_files(
+        return remaining_kpi_files
+
+    def get_archive_data_files(self) -> List[str]:
+        """Find the archive KPI data files"""
+        archive_kpi_files = self.file_catalog.scan_folder(self.archive_kpi_path, config.DATA_FILE_EXTENSIONS)
+        print(f"Found {len(archive_kpi_files)} KPI file(s) in Archive ...\n")
+        return archive_kpi_files
+
+    def get_compacted_archive_files(self) -> List[CompactedFile]:
+        """Archive files to take from the archive store, none if there is no store or it is out of date"""
+        if self.archive_store is None or not self.archive_store.exists:
+            return []
+
+        stale_files = self.archive_store.stale_files(self.file_catalog)
+        if stale_files:
+            print(
+                f"Archive store is out of date ({len(stale_files)} archive file(s) changed or removed), reading the archive files instead. "
+                f"Run KPI_aggregation.py --compact-archives to refresh it\n"
+            )
+            return []
+        return self.archive_store.files
+
+    def get_data_date_window(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Dates a run reports on, spanning the KPI and yearly performance windows.
+        None when everything is needed (include_overall) or the dates are not set.
+        """
+        if self.include_overall:
+            return None
+
+        start_dates = [d for d in [self.kpi_start_date, self.yp_start_date] if pd.notna(d)]
+        end_dates = [d for d in [self.kpi_end_date, self.yp_end_date] if pd.notna(d)]
+        if not start_dates or not end_dates:
+            return None
+        return min(start_dates), max(end_dates) + pd.Timedelta(days=1)
+
+    def check_data_files(self):
+        """
+        Validation only mode: the file rules, column checks and date checks, reading just the header and
+        date columns of each file. Writes the errors and warnings files, no summaries or Excel output.
+        """
+        import time
+
+        start_time = time.time()
+        self.cleanup_existing_logs()
+        if self.python_errors_list:
+            self.handle_errors()
+            return
+
+        self.extract_include_archives_and_overall_options()
+        include_archives = self.validate_archives_folder() and self.include_archives
+        remaining_kpi_files = self.get_main_data_files()
+        archive_kpi_files = self.get_archive_data_files() if include_archives else []
+
+        print(f"Checking {len(remaining_kpi_files)} files and {len(archive_kpi_files)} archive file(s) ...")
+        warnings = []
+        frames = utils.iter_data_files(
             remaining_kpi_files,
-            date_parser=None,  # lambda x: dt.datetime.strptime(x, "%d-%b-%Y")
             colsExpected=config.COLS_TO_EXPECT_IN_CSV,
+            read_schema=utils.build_check_schema(),
+            archive_file_path_list=archive_kpi_files,
+            max_workers=config.INGESTION_MAX_WORKERS,
+            use_processes=config.INGESTION_USE_PROCESSES,
+            process_min_files=config.INGESTION_PROCESS_MIN_FILES,
+            catalog=self.file_catalog,
+            schema_registry=self.schema_registry,
+            warnings=warnings,
         )
-        print()
-        self.python_errors_list.extend(errors)
+
+        preprocessing_errors = []
+        n_files = 0
+        for file, df in frames:
+            utils.add_provenance(df, self.add_source_file(file))
+            _, errors, _ = self.preprocess_datasheet(df)
+            preprocessing_errors.extend(errors)
+            n_files += 1
         self.python_warnings_list.extend(warnings)
 
-        return df, df_lens, df_src_filenames
+        self.validate_columns(pd.DataFrame())
+        preprocessing_errors += self.get_missing_column_errors(self.schema_registry.mapped_columns())
+        self.python_errors_list.extend(dict.fromkeys(preprocessing_errors))
 
-    def load_archive_data(self) -> Optional[pd.DataFrame]:
-        """Load archive data if requested"""
+        self.handle_errors()
+        if self.python_warnings_list:
+            utils.write_to_file(self.python_warnings_filepath, self.python_warnings_list)
 
-        print("\nReading Archives ...\n")
-        archive_kpi_files = glob.glob(os.path.join(self.archive_kpi_path, "*.csv"))
-        print(f"Found {len(archive_kpi_files)} KPI file(s) in Archive ...\n")
+        print(
+            f"Checked {n_files} file(s) in {round(time.time() - start_time)} seconds: "
+            f"{len(self.python_errors_list)} error(s), {len(self.python_warnings_list)} warning(s)"
+        )
 
-        if not archive_kpi_files:
-            return None
+    def compact_archives(self):
+        """Fold the _Archive folder into the archive store, after the rename and preprocessing steps"""
+        if self.archive_store is None:
+            print("Archive store is disabled (USE_ARCHIVE_STORE)")
+            return
+        if not self.validate_archives_folder():
+            print(f"No archive folder found --> {self.archive_kpi_path}")
+            return
+
+        archive_kpi_files = self.get_archive_data_files()
+        warnings = []
+        frames = utils.iter_data_files(
+            [],
+            colsExpected=config.COLS_TO_EXPECT_IN_CSV,
+            parse_cache=self.parse_cache,
+            read_schema=self.read_schema,
+            engine=self.csv_read_engine,
+            archive_file_path_list=archive_kpi_files,
+            max_workers=config.INGESTION_MAX_WORKERS,
+            use_processes=config.INGESTION_USE_PROCESSES,
+            process_min_files=config.INGESTION_PROCESS_MIN_FILES,
+            catalog=self.file_catalog,
+            schema_registry=self.schema_registry,
+            warnings=warnings,
+        )
 
-        df_archive, errors, _, _ = utils.read_data_files(archive_kpi_files, date_parser=None, colsExpected=config.COLS_TO_EXPECT_IN_CSV)
-        self.python_errors_list.extend(errors)
-        return df_archive
+        compacted_files = []
+        chunks = []
+        invalid_projects = set()
+        for file, df in frames:
+            n_rows = len(df)
+            source_columns, version = utils.get_header_layout_key(df)
+            # file IDs follow the order of the compacted files
+            utils.add_provenance(df, self.add_source_file(file))
+            df, errors, invalid_file_projects = self.preprocess_datasheet(df)
+
+            stat = self.file_catalog.stat(file)
+            compacted_files.append(
+                CompactedFile(file, stat.st_size, stat.st_mtime_ns, n_rows, list(source_columns), str(version), errors, list(invalid_file_projects))
+            )
+            chunks.append(df)
+            invalid_projects.update(invalid_file_projects)
+
+        if warnings:
+            print("\n".join(warnings))
+        if not chunks:
+            print("No archive file could be read, nothing to compact")
+            return
+
+        df, _ = self.combine_datasheets(chunks, invalid_projects)
+        self.archive_store.compact(compacted_files, df)
+        print(f"Compacted {len(compacted_files)} archive file(s), {len(df)} rows, into {len(self.archive_store.partitions)} partition(s)")
+
+    def add_source_file(self, path: str) -> int:
+        """Add a data file to the source file table, return the ID its rows carry in COL_SOURCE_FILE_ID"""
+        self.source_files.append(os.path.basename(path))
+        return len(self.source_files) - 1
+
+    def load_data_files(self, include_archives: bool) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Load main KPI data files, and archive files if requested, in a single ingestion pass.
+        Each file is preprocessed as soon as it is read and the clean chunks are concatenated once.
+        Files unchanged since the previous run of a long running process are taken from the datasheet store.
+        """
+        remaining_kpi_files = self.get_main_data_files()
+        archive_kpi_files = self.get_archive_data_files() if include_archives else []
+
+        # mismatch warnings are reported in file order, whether a file is read, stored or skipped
+        all_files, _ = utils.plan_ingestion([remaining_kpi_files, archive_kpi_files], self.file_catalog)
+        self.schema_registry.set_file_order([os.path.basename(file) for file in all_files])
+
+        # archive files folded into the archive store are read from its partitions
+        compacted_files = self.get_compacted_archive_files() if include_archives else []
+        compacted_paths = {compacted.path for compacted in compacted_files}
+        archive_kpi_files = [file for file in archive_kpi_files if file not in compacted_paths]
+        for compacted in compacted_files:
+            self.schema_registry.register(compacted.source_columns, compacted.version, os.path.basename(compacted.path))
+
+        ordered_files, _ = utils.plan_ingestion([remaining_kpi_files, archive_kpi_files], self.file_catalog)
+        self.source_files = []
+        file_ids = {file: self.add_source_file(file) for file in ordered_files}
+
+        # files with no work in the date window are not read, their manifest entry stands in for them
+        skipped_files = {}
+        window = self.get_data_date_window()
+        if window is not None and self.date_manifest is not None:
+            for file in ordered_files:
+                date_range = self.date_manifest.get(file, self.file_catalog.stat(file))
+                if date_range is not None and not date_range.overlaps(*window):
+                    self.schema_registry.register(date_range.source_columns, date_range.version, os.path.basename(file))
+                    skipped_files[file] = date_range
+            if skipped_files:
+                print(f"{len(skipped_files)} file(s) outside the date window are left out of the month-wise sheet and the aggregated datasheet (USE_DATE_RANGE_PRUNING)")
+
+        # memory budget mode: the preprocessed chunks go to disk instead of the in-memory datasheet store
+        if config.MEMORY_BUDGET_MB is not None and window is None:
+            # include_overall (or no dates) keeps every row for the summaries, there is no budget to hold
+            print("MEMORY_BUDGET_MB is ignored when include_overall is set, every row stays in memory")
+        elif config.MEMORY_BUDGET_MB is not None:
+            self.spill_store = SpillStore(self.spill_folder_path, int(config.MEMORY_BUDGET_MB * 2**20), self.dtype_backend)
+
+        stored_files = set()
+        for file in ordered_files:
+            if file in skipped_files or self.spill_store is not None:
+                continue
+            stored = self.datasheet_store.get(file, self.file_catalog.stat(file))
+            if stored is not None:
+                self.schema_registry.register(stored.source_columns, stored.version, os.path.basename(file))
+                stored_files.add(file)
+
+        # Read data files
+        print(
+            f"Reading remaining {len(remaining_kpi_files)} files and {len(archive_kpi_files)} archive file(s) "
+            f"({len(skipped_files)} file(s) outside the date window, {len(stored_files)} unchanged file(s) already in memory, "
+            f"{len(compacted_files)} archive file(s) in the archive store) ..."
+        )
+        warnings = []
+        frames = utils.iter_data_files(
+            [file for file in remaining_kpi_files if file not in stored_files and file not in skipped_files],
+            date_parser=None,  # lambda x: dt.datetime.strptime(x, "%d-%b-%Y")
+            colsExpected=config.COLS_TO_EXPECT_IN_CSV,
+            parse_cache=self.parse_cache,
+            read_schema=self.read_schema,
+            engine=self.csv_read_engine,
+            archive_file_path_list=[file for file in archive_kpi_files if file not in stored_files and file not in skipped_files],
+            max_workers=config.INGESTION_MAX_WORKERS,
+            use_processes=config.INGESTION_USE_PROCESSES,
+            process_min_files=config.INGESTION_PROCESS_MIN_FILES,
+            catalog=self.file_catalog,
+            schema_registry=self.schema_registry,
+            warnings=warnings,
+        )
+
+        print("Pre processing Datasheets ...\n")
+        for file, df in frames:
+            n_rows = len(df)
+            source_columns, version = utils.get_header_layout_key(df)
+            utils.add_provenance(df, file_ids[file])
+            df, errors, invalid_file_projects = self.preprocess_datasheet(df)
+            if self.date_manifest is not None:
+                self.date_manifest.record(file, self.file_catalog.stat(file), df, n_rows, source_columns, version, errors, invalid_file_projects)
+            if self.spill_store is not None:
+                self.spill_store.append(df)
+                df = None
+            self.datasheet_store.put(file, self.file_catalog.stat(file), df, n_rows, source_columns, version, errors, invalid_file_projects)
+        print()
+        self.python_warnings_list.extend(warnings)
+
+        chunks = []
+        preprocessing_errors = []
+        invalid_projects = set()
+        for file in ordered_files:
+            if file in skipped_files:
+                preprocessing_errors.extend(skipped_files[file].errors)
+                invalid_projects.update(skipped_files[file].invalid_projects)
+                continue
+
+            stored = self.datasheet_store.get(file, self.file_catalog.stat(file))
+            if stored is None:
+                continue  # unreadable, reported in the warnings
+            if stored.df is not None:
+                # a chunk kept from a previous run carries the file ID it had then
+                stored.df[config.COL_SOURCE_FILE_ID] = np.int32(file_ids[file])
+                chunks.append(stored.df)
+            preprocessing_errors.extend(stored.errors)
+            invalid_projects.update(stored.invalid_projects)
+        self.datasheet_store.retain(ordered_files)
+        if self.date_manifest is not None:
+            self.date_manifest.save()
+
+        if compacted_files:
+            # the store holds the file IDs of the compaction, in the order of compacted_files
+            first_id = len(self.source_files)
+            for compacted in compacted_files:
+                self.add_source_file(compacted.path)
+            # every partition, the month-wise sheet and the aggregated datasheet cover the whole history
+            df = self.archive_store.load()
+            if config.COL_SOURCE_FILE_ID in df.columns:
+                df[config.COL_SOURCE_FILE_ID] += np.int32(first_id)
+            if len(df.columns) and self.spill_store is not None:
+                self.spill_store.append(df)
+            elif len(df.columns):
+                chunks.append(df)
+            del df
+            for compacted in compacted_files:
+                preprocessing_errors.extend(compacted.errors)
+                invalid_projects.update(compacted.invalid_projects)
+
+        if self.spill_store is not None:
+            df, errors = self.combine_spilled_datasheets(invalid_projects)
+        else:
+            df, errors = self.combine_datasheets(chunks, invalid_projects)
+        del chunks
+        if not self.keep_datasheets:
+            self.datasheet_store.drop_frames()
+        preprocessing_errors = list(dict.fromkeys(preprocessing_errors + errors))
+        if preprocessing_errors:
+            print("\nSome errors occurred during pre-processing:\n" + "\n".join(preprocessing_errors))
+
+        if config.USE_COMPACT_DTYPES:
+            self.compact_dataframe(df)
+        self.project_table = utils.build_project_table(df, self.source_files)
+        self.work_events = work_events.build_work_events(df)
+
+        return df, preprocessing_errors
+
+    def compact_dataframe(self, df: pd.DataFrame):
+        """Switch the combined frame to compact dtypes in place, reporting the memory per column before and after"""
+        report = memory_diet.MemoryReport()
+        report.record("combined", df)
+        float_cols = memory_diet.compact_dtypes(df)
+        report.record("compact", df)
+
+        report.save(self.memory_report_filepath)
+        print(f"Compact dtypes --> {report.totals()}")
+        if float_cols:
+            print(f"Counters kept as float (fractional or missing values): {', '.join(float_cols)}")
 
     def validate_columns(self, df: pd.DataFrame):
         """Validate that CSV columns match expectations"""
 
-        actual_cols = df.columns.tolist()
+        # the header layouts resolved during ingestion already hold every file's columns,
+        # including the ones a read schema leaves out of the frame
+        if self.schema_registry.files_by_layout:
+            actual_cols = self.schema_registry.mapped_columns()
+        else:
+            actual_cols = [col for col in df.columns if col not in config.PROVENANCE_COLS]
         if set(config.COLS_TO_EXPECT_IN_CSV) == set(actual_cols):
             return  # Columns match, no issues
 
@@ -201,47 +579,60 @@ class KPIDataProcessor:
         # Currently ignoring specific column mismatch errors
         self.python_errors_list = [entry for entry in self.python_errors_list if not 'Columns mismatch. Extra: "[]"' in entry]
 
-    def datasheets_preprocessing(self, df: pd.DataFrame, df_lens: List[int]) -> Tuple[pd.DataFrame, List[str]]:
+    def preprocess_datasheet(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, List[str], set]:
         """
-        Preprocess datasheet data with improved error reporting
+        Normalize, type and date-validate the rows of one datasheet file.
+        Returns the clean frame, the errors and the projects with invalid dates, whose rows are dropped.
+        Columns missing from the file are left for combine_datasheets.
         Modified by Kamel Mohamed on 19/03/2024 to include filename, row number and value in date columns errors
         """
-        import numpy as np
-
-        print("Pre processing Datasheets ...\n")
         errors = []
         error_filenames = set()
 
         # Convert columns to lowercase
+        lowered_cols = set()
         for col in config.COLS_TO_LOWER_CASE:
+            if col not in df.columns:
+                continue
             try:
                 df[col] = df[col].fillna("").str.lower()
+                lowered_cols.add(col)
             except Exception as e:
                 msg = f'Unable to convert to lower case / fillna. Column: "{col}"'
                 errors.append(msg)
 
-        # Convert numerical columns to integer
+        # Convert numerical columns to integer (already numeric when read with the schema)
         for col in config.INTEGER_COLS:
+            if col not in df.columns:
+                continue
             try:
-                df[col] = pd.to_numeric(df[col]).fillna(0)
+                if not pd.api.types.is_numeric_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col])
+                df[col] = df[col].fillna(0)
             except Exception as e:
                 msg = f'Unable to convert to Number type or fillna. Column: "{col}"'
                 errors.append(msg)
 
         # Convert date columns with detailed error reporting
-        for col in config.DATE_COLS:
+        parsed_date_cols = utils.parse_date_columns(df, config.DATE_COLS, dayfirst=True, max_workers=config.DATE_PARSE_MAX_WORKERS)
+        source_files = np.asarray(self.source_files, dtype=object)
+        for col, converted in parsed_date_cols.items():
             try:
-                converted = pd.to_datetime(df[col], infer_datetime_format=True, dayfirst=True, errors="coerce")
-                invalid_rows: pd.DataFrame = df[converted.isna() & df[col].notna()]
-                if not invalid_rows.empty:
-                    for idx in invalid_rows.index:
-                        error_row_num = self.get_local_row(idx, df_lens)
-                        filename = df.loc[idx, config.COL_PROJECT_NAME]
-                        val = df.loc[idx, col]
-                        msg = f'File: "{filename}" ||| Col: "{col}" ||| Row Num: "{error_row_num + 1}" ||| Row value: "{val}". Error: Invalid date'
-                        errors.append(msg)
-                        print(msg)
-                        error_filenames.add(filename)
+                if isinstance(converted, Exception):
+                    raise converted
+                # file and row number come from the provenance columns
+                invalid_rows = np.flatnonzero(converted.isna() & df[col].notna())
+                if len(invalid_rows):
+                    filenames = source_files[df[config.COL_SOURCE_FILE_ID].to_numpy()[invalid_rows]]
+                    row_nums = df[config.COL_SOURCE_ROW].to_numpy()[invalid_rows] + 1
+                    values = df[col].to_numpy()[invalid_rows]
+                    msgs = [
+                        f'File: "{filename}" ||| Col: "{col}" ||| Row Num: "{row_num}" ||| Row value: "{val}". Error: Invalid date'
+                        for filename, row_num, val in zip(filenames, row_nums, values)
+                    ]
+                    errors.extend(msgs)
+                    print("\n".join(msgs))
+                    error_filenames.update(df[config.COL_PROJECT_NAME].to_numpy()[invalid_rows])
                 df[col] = converted
             except Exception as e:
                 errors.append(f"General failure parsing column: {col}. Error: {str(e)}")
@@ -250,44 +641,115 @@ class KPIDataProcessor:
         if error_filenames:
             df = df[~df[config.COL_PROJECT_NAME].isin(error_filenames)].reset_index(drop=True)
 
-        # Convert string columns
+        # Convert string columns (lower cased columns are already strings)
         for col in config.STRING_COLS:
+            if col in lowered_cols or col not in df.columns:
+                continue
             try:
-                df[col] = df[col].fillna("").astype(str)
+                df[col] = df[col].fillna("")
+                if not pd.api.types.is_string_dtype(df[col]):
+                    df[col] = df[col].astype(str)
             except Exception as e:
                 msg = f'Unable to convert to String type or fillna. Column: "{col}"'
                 errors.append(msg)
 
-        # Reset index
         try:
-            df = df.reset_index(drop=True)
-        except Exception as e:
-            msg = "Unable to reset index."
-            errors.append(msg)
-
-        try:
-            df["extracted_project_date"] = df[config.COL_PROJECT_NAME].str.extract(r"^(20\d{2}\.\d{2}\.\d{2})")
+            df["extracted_project_date"] = df[config.COL_PROJECT_NAME].str.extract(r"^(?P<extracted_project_date>20\d{2}\.\d{2}\.\d{2})", expand=False)
             df["extracted_project_date"] = pd.to_datetime(df["extracted_project_date"], format="%Y.%m.%d", errors="coerce")
         except Exception as e:
             msg = "Unable to extract project date from project name."
             errors.append(msg)
 
-        if errors:
-            print("\nSome errors occurred during pre-processing:\n" + "\n".join(errors))
+        return df, errors, error_filenames
+
+    def combine_datasheets(self, chunks: List[pd.DataFrame], invalid_projects: set) -> Tuple[pd.DataFrame, List[str]]:
+        """Concatenate the preprocessed datasheets, dropping the projects with invalid dates from every file"""
+
+        # a project can be spread over several files (e.g. main and archive), only those chunks are filtered
+        if invalid_projects:
+            chunks = [
+                chunk[~chunk[config.COL_PROJECT_NAME].isin(invalid_projects)] if chunk[config.COL_PROJECT_NAME].isin(invalid_projects).any() else chunk
+                for chunk in chunks
+            ]
+
+        df = pd.concat(chunks, ignore_index=True)
+        if config.COL_SOURCE_FILE_ID in df.columns:
+            df[config.COL_ROW_ID] = utils.get_row_ids(df)
+        self.staff_dictionary.encode(df)
+
+        # columns missing from some of the files only need their gaps filled
+        partial_cols = set(df.columns) - set.intersection(*(set(chunk.columns) for chunk in chunks))
+        self.fill_column_gaps(df, [col for col in df.columns if col in partial_cols])
+
+        return df, self.get_missing_column_errors(df.columns)
+
+    def fill_column_gaps(self, df: pd.DataFrame, cols: List[str]):
+        """Fill the rows of files that lack some of the cols, adding the columns df doesn't have at all"""
+        for col in cols:
+            if col in config.COLS_TO_LOWER_CASE or col in config.STRING_COLS:
+                df[col] = df[col].fillna("") if col in df.columns else ""
+            elif col in config.INTEGER_COLS:
+                df[col] = df[col].fillna(0) if col in df.columns else 0.0
+            elif col not in df.columns:
+                df[col] = pd.NaT if col in config.DATE_COLS else np.nan
+
+    def get_missing_column_errors(self, columns) -> List[str]:
+        """Preprocessing errors for the expected columns missing from every file"""
+        errors = []
+        for col in config.COLS_TO_LOWER_CASE:
+            if col not in columns:
+                errors.append(f'Unable to convert to lower case / fillna. Column: "{col}"')
 
-        return df, errors
+        for col in config.STRING_COLS:
+            if col not in columns:
+                errors.append(f'Unable to convert to String type or fillna. Column: "{col}"')
+
+        for col in config.INTEGER_COLS:
+            if col not in columns:
+                errors.append(f'Unable to convert to Number type or fillna. Column: "{col}"')
 
-    def get_local_row(self, row_id: int, df_lengths: List[int]) -> int:
-        """Given a global row ID across multiple stacked DataFrames,
-        return the local row index within its corresponding DataFrame.
+        for col in config.DATE_COLS:
+            if col not in columns:
+                errors.append(f"General failure parsing column: {col}. Error: '{col}'")
+        return errors
+
+    def combine_spilled_datasheets(self, invalid_projects: set) -> Tuple[pd.DataFrame, List[str]]:
+        """
+        Memory budget mode: stream the spilled chunks back batch by batch. The month-wise tables, which cover
+        the whole history, are added up from per batch tables, and only the rows with work in the date window
+        are kept for the other summaries. Only used with a date window, include_overall needs every row.
         """
+        all_cols = list(self.spill_store.columns)
+        window = self.get_data_date_window()
+        window_chunks = []
+        month_wise_batches = []
+        staff_orders = {role: {} for role in work_events.ROLE_SLOTS}
+
+        print(f"Streaming {len(self.spill_store)} spilled chunk(s) back in batches of {config.MEMORY_BUDGET_MB} MB ...\n")
+        for batch_no, batch in enumerate(self.spill_store.iter_batches()):
+            df, _ = self.combine_datasheets(batch, invalid_projects)
+            del batch
+            self.fill_column_gaps(df, [col for col in all_cols if col not in df.columns])
+            df = df[all_cols]
+
+            in_window = pd.Series(False, index=df.index)
+            for col in config.DATE_COLS:
+                if col in df.columns:
+                    in_window |= df[col].between(*window)
+            window_chunks.append(df[in_window])
+
+            month_wise_batches.append(self.get_month_wise_tables(df))
+            for role, staff_order in staff_orders.items():
+                work_events.update_staff_order(staff_order, df, role, batch_no)
+            del df
+
+        self.month_wise_tables = [
+            utils.combine_month_wise_tables(list(tables), staff_orders[role]) for tables, role in zip(zip(*month_wise_batches), MONTH_WISE_ROLES)
+        ]
+        self.spill_store.clear()
 
-        total_rows_so_far = 0
-        for current_df_len in df_lengths:
-            total_rows_so_far += current_df_len
-            if row_id < total_rows_so_far:
-                local_row = row_id - (total_rows_so_far - current_df_len)
-                return local_row
+        df, _ = self.combine_datasheets(window_chunks, set())
+        return df, self.get_missing_column_errors(all_cols)
 
     def handle_errors(self):
         """Handle errors by writing to file and potentially exiting"""
@@ -397,22 +859,23 @@ class KPIDataProcessor:
         # Generate summaries for all roles
         print("Generating summary reports for photographers, photostackers, and retouchers ...\n")
 
+        # the summaries below only read df (the month-wise ones, which add a column, get their own copy)
         # --------- Photographers summary ---------
-        df_photographers = summary_of_photographers_all_projects(df.copy(), self.include_overall, self.kpi_start_date, self.kpi_end_date)
-        df_photographers_project_wise = summary_of_photographers_project_wise(df.copy(), self.kpi_start_date, self.kpi_end_date)
+        df_photographers = summary_of_photographers_all_projects(df, self.include_overall, self.kpi_start_date, self.kpi_end_date, self.work_events)
+        df_photographers_project_wise = summary_of_photographers_project_wise(df, self.kpi_start_date, self.kpi_end_date, self.project_table, self.work_events)
 
         # --------- Photostackers summary ---------
-        df_photostackers = summary_of_photostackers_all_projects(df.copy(), self.include_overall, self.kpi_start_date, self.kpi_end_date)
-        df_photostackers_project_wise = summary_of_photostackers_project_wise(df.copy(), self.kpi_start_date, self.kpi_end_date)
+        df_photostackers = summary_of_photostackers_all_projects(df, self.include_overall, self.kpi_start_date, self.kpi_end_date, self.work_events)
+        df_photostackers_project_wise = summary_of_photostackers_project_wise(df, self.kpi_start_date, self.kpi_end_date, self.project_table, self.work_events)
 
         # --------- Retouchers summary ---------
-        df_retouchers = summary_of_retouchers_all_projects(df.copy(), self.include_overall, self.kpi_start_date, self.kpi_end_date)
-        df_retouchers_project_wise = summary_of_retouchers_project_wise(df.copy(), self.kpi_start_date, self.kpi_end_date)
+        df_retouchers = summary_of_retouchers_all_projects(df, self.include_overall, self.kpi_start_date, self.kpi_end_date, self.work_events)
+        df_retouchers_project_wise = summary_of_retouchers_project_wise(df, self.kpi_start_date, self.kpi_end_date, self.project_table, self.work_events)
 
         # --------- Photography summary ---------
         # Photography summary = How many items and images on each Photographer date
         df_photography_summary_project_wise: pd.DataFrame = summary_of_photography_project_wise(
-            df.copy(), self.include_overall, self.kpi_start_date, self.kpi_end_date
+            df, self.include_overall, self.kpi_start_date, self.kpi_end_date, self.project_table
         )
         df_photography_summary = (
             df_photography_summary_project_wise.groupby("Photography_date")
@@ -434,27 +897,42 @@ class KPIDataProcessor:
             "photography_summary_project_wise": df_photography_summary_project_wise,
         }
 
-    def calculate_monthly_data(self, summary_data: dict, df: pd.DataFrame) -> dict:
-        """Calculate monthly data for photographers, photostackers, and retouchers"""
+    def get_month_wise_tables(self, df: pd.DataFrame, events: Optional[pd.DataFrame] = None) -> List[pd.DataFrame]:
+        """
+        Month-wise tables for photographers, photostackers, and retouchers, in MONTH_WISE_KEYS order.
+        The groupby engine keeps the periods as columns, they are labelled once the tables are final
+        """
 
         from summary_photographers import summary_of_photographers_by_month
         from summary_photostackers import summary_of_photostackers_by_month
         from summary_retouchers import summary_of_retouchers_by_month
 
+        if config.SUMMARY_ENGINE != "groupby":
+            df = df.copy()  # the loops add a month column
+
+        df_photographers_by_month_items = summary_of_photographers_by_month(df, events)
+        df_photostackers_by_month_rename, df_photostackers_by_month_adjust, df_photostackers_by_month_photostack = summary_of_photostackers_by_month(df, events)
+        df_retouchers_by_month_transfer, df_retouchers_by_month_retouched, df_retouchers_by_month_variance = summary_of_retouchers_by_month(df, events)
+
+        return [
+            df_photographers_by_month_items,
+            df_photostackers_by_month_rename,
+            df_photostackers_by_month_adjust,
+            df_photostackers_by_month_photostack,
+            df_retouchers_by_month_transfer,
+            df_retouchers_by_month_retouched,
+            df_retouchers_by_month_variance,
+        ]
+
+    def calculate_monthly_data(self, summary_data: dict, df: pd.DataFrame) -> dict:
+        """Calculate monthly data for photographers, photostackers, and retouchers"""
+
         print("Calculating monthly data for photographers, photostackers, and retouchers ...\n")
-        df_photographers_by_month_items = summary_of_photographers_by_month(df.copy())
-        df_photostackers_by_month_rename, df_photostackers_by_month_adjust, df_photostackers_by_month_photostack = summary_of_photostackers_by_month(df.copy())
-        df_retouchers_by_month_transfer, df_retouchers_by_month_retouched, df_retouchers_by_month_variance = summary_of_retouchers_by_month(df.copy())
-
-        summary_data["monthly_data"] = {
-            "photographers_items": df_photographers_by_month_items,
-            "photostackers_rename": df_photostackers_by_month_rename,
-            "photostackers_adjust": df_photostackers_by_month_adjust,
-            "photostackers_photostack": df_photostackers_by_month_photostack,
-            "retouchers_transfer": df_retouchers_by_month_transfer,
-            "retouchers_retouched": df_retouchers_by_month_retouched,
-            "retouchers_variance": df_retouchers_by_month_variance,
-        }
+        # already added up batch by batch in the memory budget mode
+        month_wise_tables = self.month_wise_tables if self.month_wise_tables is not None else self.get_month_wise_tables(df, self.work_events)
+        month_wise_tables = [summary_engine.label_periods(table, config.MONTH_WISE_PERIOD) for table in month_wise_tables]
+
+        summary_data["monthly_data"] = dict(zip(MONTH_WISE_KEYS, month_wise_tables))
 
         return summary_data
 
@@ -523,7 +1001,9 @@ class KPIDataProcessor:
         user_end_date_yp_obj = yearly_performance_points.calc_month_end_date(self.yp_end_date)
         user_date_list = yearly_performance_points.date_list(self.yp_start_date, user_end_date_yp_obj)
 
-        yearly_summary_data = yearly_performance_points.calculate_yearly_summary_tables(df, user_date_list, ppj_dict, sub_catg_list)
+        yearly_summary_data = yearly_performance_points.calculate_yearly_summary_tables(
+            df, user_date_list, ppj_dict, sub_catg_list, self.project_table, self.work_events
+        )
 
         df_yearly_performance, expected_kpi_set = yearly_performance_points.calculate_yearly_performance_table(
             yearly_summary_data, staff_and_their_categories, df_staff_exp_kpi_modf, active_staff
@@ -545,7 +1025,7 @@ class KPIDataProcessor:
 
         print("Creating Excel output file ...\n")
         # Save aggregated datasheet
-        df.to_excel(self.datasheet_aggregated_filepath, index=False)
+        df.drop(columns=config.PROVENANCE_COLS, errors="ignore").to_excel(self.datasheet_aggregated_filepath, index=False)
 
         # Setup Excel writer
         overall_summary_sheet = self.df_output_sheet_names.iloc[0, 0]
@@ -807,14 +1287,9 @@ class KPIDataProcessor:
             self.set_date_ranges()
             self.extract_include_archives_and_overall_options()
 
-            # Load main data
-            df, df_lens, df_src_filenames = self.load_main_data_files()
-
-            # Load archive data if needed
-            if self.validate_archives_folder() and self.include_archives:
-                df_archive = self.load_archive_data()
-                if df_archive is not None:
-                    df = pd.concat([df, df_archive])
+            # Load main data, and archive data if needed
+            include_archives = self.validate_archives_folder() and self.include_archives
+            df, preprocessing_errors = self.load_data_files(include_archives)
 
             # Validate columns
             self.validate_columns(df)
@@ -827,8 +1302,7 @@ class KPIDataProcessor:
             if self.python_warnings_list:
                 utils.write_to_file(self.python_warnings_filepath, self.python_warnings_list)
 
-            # Preprocess data
-            df, preprocessing_errors = self.datasheets_preprocessing(df, df_lens)
+            # Preprocessing errors, reported after the column checks
             self.python_errors_list.extend(preprocessing_errors)
 
             if self.python_errors_list:
@@ -888,8 +1362,123 @@ class KPIDataProcessor:
             raise SystemExit(1)
 
 
+def get_watched_files_state(curr_path: str) -> dict:
+    """
+    Size and mtime of the jobsheet exports and the archives. KPI_Calculator.xlsm is left out: the KPI button
+    saves it before every run and hands the run to the watcher through the request file
+    """
+    datasheet_folder_path = os.path.join(curr_path, config.DATESHEETS_FOLDER_NAME)
+    catalog = FileCatalog()
+    for folder in [datasheet_folder_path, os.path.join(datasheet_folder_path, config.ARCHIVE_FOLDER_NAME)]:
+        if os.path.isdir(folder):
+            catalog.scan_folder(folder, config.DATA_FILE_EXTENSIONS)
+    return {entry.path: DatasheetStore.signature(entry.stat) for entry in catalog}
+
+
+def run_watched_kpi(datasheet_store: DatasheetStore) -> int:
+    """One KPI run of the watcher, the exit code the same run would have as a script. Nothing stops the watcher"""
+    try:
+        processor = KPIDataProcessor(datasheet_store)
+        result = processor.process_kpi_data()
+    except SystemExit as e:
+        print("Run failed, see the errors file. Waiting for the next change ...\n")
+        return e.code if isinstance(e.code, int) else 1
+    except Exception:
+        # e.g. the output workbook is open and locked in Excel
+        print(f"Run failed:\n{traceback.format_exc()}\nWaiting for the next change ...\n")
+        return 1
+
+    if not result:
+        print("Run failed, see the errors file. Waiting for the next change ...\n")
+        return 1
+    print(f"Processed {len(result['dataframe'])} records, {len(datasheet_store)} file(s) in memory\n")
+    return 0
+
+
+def keep_heartbeat(heartbeat_filepath: str, stop):
+    """Touch the heartbeat file until stop is set, also while a run is busy, so the KPI button knows the watcher is alive"""
+    while not stop.is_set():
+        try:
+            Path(heartbeat_filepath).touch()
+        except OSError:
+            pass
+        stop.wait(config.WATCH_HEARTBEAT_SECONDS)
+
+
+def watch(poll_interval: Optional[float] = None):
+    """
+    Long running mode: poll Datasheet/ and _Archive/ and rerun the KPI report whenever they change, and run it
+    when the KPI button asks for it through the request file. The preprocessed datasheets stay in memory, so a
+    rerun only reads the files that changed. Runs happen one at a time in this process, the button does not
+    start its own interpreter while the watcher is alive.
+    """
+    import threading
+    import time
+
+    poll_interval = poll_interval or config.WATCH_POLL_INTERVAL_SECONDS
+    intermediate_folder_path = os.path.join(os.getcwd(), config.PYTHON_CODES_FOLDER_NAME, config.INTERMEDIATE_FOLDER_NAME)
+    os.makedirs(intermediate_folder_path, exist_ok=True)
+    heartbeat_filepath = os.path.join(intermediate_folder_path, config.WATCH_HEARTBEAT_FILENAME)
+    request_filepath = os.path.join(intermediate_folder_path, config.WATCH_REQUEST_FILENAME)
+    done_filepath = os.path.join(intermediate_folder_path, config.WATCH_DONE_FILENAME)
+
+    # requests left over from an earlier watcher were already run by the button itself
+    for filepath in [request_filepath, done_filepath]:
+        if os.path.exists(filepath):
+            os.remove(filepath)
+
+    stop = threading.Event()
+    heartbeat = threading.Thread(target=keep_heartbeat, args=(heartbeat_filepath, stop), daemon=True)
+    heartbeat.start()
+
+    print(f"Watching for changes every {poll_interval} seconds, Ctrl+C to stop ...\n")
+    datasheet_store = DatasheetStore()
+    last_run_state = None
+    last_poll_state = None
+    next_poll = 0.0
+    try:
+        while True:
+            if os.path.exists(request_filepath):
+                os.remove(request_filepath)
+                print("Run requested by the KPI button ...\n")
+                return_code = run_watched_kpi(datasheet_store)
+                with open(done_filepath, "w") as f:
+                    f.write(str(return_code))
+                last_run_state = get_watched_files_state(os.getcwd())
+
+            if time.monotonic() >= next_poll:
+                state = get_watched_files_state(os.getcwd())
+                # run once the files stopped changing between two polls, not while an export is still being written
+                if state != last_run_state and state == last_poll_state:
+                    run_watched_kpi(datasheet_store)
+                    last_run_state = state
+                last_poll_state = state
+                next_poll = time.monotonic() + poll_interval
+
+            time.sleep(config.WATCH_REQUEST_POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    finally:
+        stop.set()
+        heartbeat.join()
+        if os.path.exists(heartbeat_filepath):
+            os.remove(heartbeat_filepath)
+
+
 def main():
     """Main entry point"""
+    if "--watch" in sys.argv[1:]:
+        watch()
+        return
+
+    if "--check" in sys.argv[1:]:
+        KPIDataProcessor().check_data_files()
+        return
+
+    if "--compact-archives" in sys.argv[1:]:
+        KPIDataProcessor().compact_archives()
+        return
+
     print("KPI Aggregation Script Started ...\n")
     processor = KPIDataProcessor()
     result = processor.process_kpi_data()
@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+from typing import List, NamedTuple
+
+import pandas as pd
+
+import utils
+
+ROW_ORDER_COL = "_archive_row"
+
+
+class CompactedFile(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    n_rows: int
+    source_columns: List[str]
+    version: str
+    errors: List[str]
+    invalid_projects: List[str]
+
+
+class ArchiveStore:
+    """
+    The _Archive jobsheets folded into parquet partitions by extracted_project_date year and month,
+    after the rename and preprocessing steps. Archived projects don't change, so archive runs read
+    the partitions instead of parsing the jobsheets again, optionally only those whose work dates fall
+    in a date window.
+    """
+
+    MANIFEST_FILENAME = "manifest.json"
+    FORMAT_VERSION = 2  # 2: rows carry the provenance columns
+    UNKNOWN_PARTITION = "unknown"
+
+    def __init__(self, store_dir: str, reader_key: str = "", dtype_backend: str = None):
+        self.store_dir = store_dir
+        self.reader_key = reader_key
+        self.dtype_backend = dtype_backend
+        self.manifest_filepath = os.path.join(store_dir, self.MANIFEST_FILENAME)
+        self.files: List[CompactedFile] = []
+        self.partitions: List[dict] = []
+        self._load_manifest()
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_filepath):
+            return
+        try:
+            with open(self.manifest_filepath, "r") as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"Unable to read archive store manifest --> {e}")
+            return
+        if manifest.get("reader_key") != self.reader_key:
+            print("Archive store was compacted with other read settings, ignoring it")
+            return
+        if manifest.get("format_version", 1) != self.FORMAT_VERSION:
+            print("Archive store was compacted by an older version, ignoring it")
+            return
+        self.files = [CompactedFile(**entry) for entry in manifest["files"]]
+        self.partitions = manifest["partitions"]
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.files)
+
+    def stale_files(self, catalog) -> List[str]:
+        """Compacted files that were changed or removed since the compaction"""
+        stale = []
+        for compacted in self.files:
+            stat = catalog.stat(compacted.path)
+            if stat is None or (stat.st_size, stat.st_mtime_ns) != (compacted.size, compacted.mtime_ns):
+                stale.append(compacted.path)
+        return stale
+
+    def compact(self, files: List[CompactedFile], df: pd.DataFrame):
+        """Replace the store with df, the preprocessed rows of files in file order"""
+        tmp_dir = self.store_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        # the partitions are read back in the original row order
+        df = df.assign(**{ROW_ORDER_COL: range(len(df))})
+        project_dates = df["extracted_project_date"]
+        partition_keys = project_dates.dt.strftime("year=%Y/month=%m").fillna(self.UNKNOWN_PARTITION)
+
+        partitions = []
+        for key, index in partition_keys.groupby(partition_keys, sort=True).groups.items():
+            relative_path = os.path.join(key, "part-0.parquet")
+            os.makedirs(os.path.join(tmp_dir, key), exist_ok=True)
+            df.loc[index].to_parquet(os.path.join(tmp_dir, relative_path), index=False)
+
+            # work dates of the partition, used to prune partitions at load time
+            min_date, max_date = utils.get_work_date_range(df.loc[index])
+            partitions.append(
+                {
+                    "path": relative_path,
+                    "rows": len(index),
+                    "min_date": None if pd.isna(min_date) else min_date.isoformat(),
+                    "max_date": None if pd.isna(max_date) else max_date.isoformat(),
+                }
+            )
+
+        manifest = {"reader_key": self.reader_key, "format_version": self.FORMAT_VERSION, "files": [entry._asdict() for entry in files], "partitions": partitions}
+        with open(os.path.join(tmp_dir, self.MANIFEST_FILENAME), "w") as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.store_dir)
+        self.files = files
+        self.partitions = partitions
+
+    def load(self, start_date=None, end_date=None) -> pd.DataFrame:
+        """
+        Rows of the partitions with work dates between start_date and end_date, all of them when no window is given.
+        Rows keep the order they had in the archive files.
+        """
+        selected = []
+        for partition in self.partitions:
+            if start_date is not None and end_date is not None:
+                if partition["min_date"] is None:
+                    continue  # no dated work, nothing a date window can pick up
+                if pd.Timestamp(partition["max_date"]) < start_date or pd.Timestamp(partition["min_date"]) > end_date:
+                    continue
+            selected.append(os.path.join(self.store_dir, partition["path"]))
+
+        print(f"Archive store: reading {len(selected)} of {len(self.partitions)} partition(s)")
+        if not selected:
+            return pd.DataFrame()
+
+        df = pd.concat([utils.read_preprocessed_parquet(path, self.dtype_backend) for path in selected], ignore_index=True)
+        df = df.sort_values(ROW_ORDER_COL).drop(columns=[ROW_ORDER_COL])
+        return df.reset_index(drop=True)
@@ -64,6 +64,13 @@ COL_PROJECT_NAME = "Project Name"
 COL_FILETAG = "Filetag"
 COL_JOBSHEET_FILEVERSION = "jobsheet_fileversion"
 
+# row provenance added at ingestion: ID of the source file in the run's file table and row number within the file.
+# The row ID combines both into one integer, rows picked up by several date or name filters are deduplicated on it
+COL_SOURCE_FILE_ID = "_source_file_id"
+COL_SOURCE_ROW = "_source_row"
+COL_ROW_ID = "_row_id"
+PROVENANCE_COLS = [COL_SOURCE_FILE_ID, COL_SOURCE_ROW, COL_ROW_ID]
+
 UNMERGE_START_CONST_VALUES = ["cv", "na", "n/a", "fji", "transfer"]
 PHOTOGRAPHER_SIGN_CONST_VALUES = ["cv", "na", "n/a", "fji"]
 TO_DUPLICATE_VAL = "to duplicate"
@@ -137,6 +144,13 @@ COLS_TO_LOWER_CASE = [
 
 STRING_COLS = [COL_WARNINGS, COL_UNMERGE_START, COL_UNMERGE_END, COL_FILETAG]
 
+PHOTOGRAPHER_SIGN_COLS = [COL_PHOTOGRAPHER_1, COL_PHOTOGRAPHER_2, COL_PHOTOGRAPHER_3]
+PHOTOSTACKER_SIGN_COLS = [COL_PHOTOSTACKER_SIGN_1, COL_PHOTOSTACKER_SIGN_2]
+RETOUCHER_SIGN_COLS = [COL_RETOUCHERS_SIGN_1, COL_RETOUCHERS_SIGN_2, COL_RETOUCHERS_SIGN_3, COL_RETOUCHERS_SIGN_4, COL_RETOUCHERS_SIGN_5]
+
+# columns holding staff names, encoded against one staff dictionary after the datasheets are combined
+STAFF_SIGN_COLS = PHOTOGRAPHER_SIGN_COLS + [COL_UNMERGE_START] + PHOTOSTACKER_SIGN_COLS + RETOUCHER_SIGN_COLS
+
 INTEGER_COLS = [
     COL_RENAME,
     COL_ADJUST,
@@ -185,7 +199,81 @@ OVERALL_SUMMARY_SHEETNAME = "Overall Summary"
 PYTHON_CODES_FOLDER_NAME = "python_program"
 DATESHEETS_FOLDER_NAME = "Datasheet"
 ARCHIVE_FOLDER_NAME = "_Archive"
+
+# jobsheet exports, plain or compressed (decompressed while they are parsed)
+DATA_FILE_EXTENSIONS = (".csv", ".csv.gz", ".csv.zst")
 INTERMEDIATE_FOLDER_NAME = "intermediate"
+PARSE_CACHE_FOLDER_NAME = "parse_cache"
+
+# cache parsed jobsheet CSVs in the intermediate folder, only new or changed files are parsed again
+USE_PARSE_CACHE = True
+
+# read only COLS_TO_EXPECT_IN_CSV (and their legacy names) with dtypes taken from the column lists above
+USE_READ_SCHEMA = True
+
+# "pandas" (C parser) or "pyarrow" (multithreaded reader, Arrow-backed string columns)
+CSV_READ_ENGINE = "pandas"
+
+# pool used to parse main and archive jobsheets, None = one worker per CPU core
+INGESTION_MAX_WORKERS = None
+# worker processes instead of threads, only once at least INGESTION_PROCESS_MIN_FILES files need parsing:
+# each spawned worker (Windows) imports pandas again, which costs more than it saves on small Datasheet folders
+INGESTION_USE_PROCESSES = True
+INGESTION_PROCESS_MIN_FILES = 200
+
+# threads used to parse the date columns of a datasheet, None = one per date column
+DATE_PARSE_MAX_WORKERS = None
+
+CONFIG_SHEETS_CACHE_FILENAME = "kpi_calculator_sheets_cache.pkl"
+
+# reuse the parsed KPI_Calculator.xlsm sheets while the workbook is unchanged, keyed on its size and mtime.
+# Only helps KPI_aggregation.py --watch and runs started outside Excel: the KPI button saves the workbook before
+# every run, so button runs always miss and parse the sheets again
+USE_CONFIG_SHEETS_CACHE = True
+
+# reader for KPI_Calculator.xlsm: "auto" (calamine if installed, else openpyxl), "calamine" or "openpyxl"
+EXCEL_READER_ENGINE = "auto"
+
+ARCHIVE_STORE_FOLDER_NAME = "archive_store"
+
+# read the archives from the store built by KPI_aggregation.py --compact-archives, when it is up to date
+USE_ARCHIVE_STORE = True
+
+DATE_MANIFEST_FILENAME = "date_manifest.json"
+
+# skip the datasheets with no work in the KPI / yearly performance windows (not when include_overall is set).
+# Off by default: the skipped files are left out of the month-wise sheet, which covers the whole history, and
+# of the aggregated datasheet output. Only the summaries of the date windows are unchanged
+USE_DATE_RANGE_PRUNING = False
+
+SPILL_FOLDER_NAME = "spill"
+
+# memory budget mode: preprocessed datasheets are spilled to disk and streamed back in batches of about this
+# many MB, only the rows of the date window stay in memory. None keeps everything in memory, so does include_overall
+MEMORY_BUDGET_MB = None
+
+# opt-in compact dtypes for the aggregated frame: integer counters, categorical project / filetag / version columns.
+# A per column memory report, before and after, is written to the intermediate folder
+USE_COMPACT_DTYPES = False
+MEMORY_REPORT_FILENAME = "memory_report.csv"
+
+# engine of the summary reports: "groupby" (vectorized over the work-event table) or "loop" (one pass per staff name)
+SUMMARY_ENGINE = "groupby"
+
+# columns of the month-wise tables: "week", "month" or "quarter" (the loop engine is month only)
+MONTH_WISE_PERIOD = "month"
+
+# KPI_aggregation.py --watch: seconds between two polls of the Datasheet folder
+WATCH_POLL_INTERVAL_SECONDS = 10
+
+# hand-off between the KPI button (excel_vba/KPI.bas) and a running watcher, files in the intermediate folder.
+# The watcher keeps the heartbeat file fresh, the button drops a request file and waits for the done file
+# (holding the run's exit code) instead of starting a second interpreter
+WATCH_HEARTBEAT_FILENAME = "watch_heartbeat"
+WATCH_REQUEST_FILENAME = "watch_run_request"
+WATCH_DONE_FILENAME = "watch_run_done"
+WATCH_HEARTBEAT_SECONDS = 1
+WATCH_REQUEST_POLL_SECONDS = 0.5
 
 PYTHON_ERRORS_FILENAME = "python_errors.txt"
 PYTHON_WARNINGS_FILENAME = "python_warnings.txt"
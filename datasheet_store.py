@@ -0,0 +1,53 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+
+class StoredDatasheet(NamedTuple):
+    signature: Tuple[int, int]
+    df: pd.DataFrame
+    n_rows: int
+    source_columns: Tuple[str, ...]
+    version: str
+    errors: List[str]
+    invalid_projects: set
+
+
+class DatasheetStore:
+    """
+    Preprocessed datasheet chunks kept in memory between KPI runs, keyed by file path.
+    A chunk is reused while the file's size and mtime are unchanged, so a long running
+    process only reads and preprocesses the files that were added or re-exported.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, StoredDatasheet] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def signature(stat: os.stat_result) -> Tuple[int, int]:
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get(self, path: str, stat: Optional[os.stat_result]) -> Optional[StoredDatasheet]:
+        entry = self.entries.get(path)
+        if entry is None or stat is None or entry.signature != self.signature(stat):
+            return None
+        return entry
+
+    def put(self, path: str, stat: os.stat_result, df: pd.DataFrame, n_rows: int, source_columns, version: str, errors, invalid_projects):
+        self.entries[path] = StoredDatasheet(self.signature(stat), df, n_rows, tuple(source_columns), version, list(errors), set(invalid_projects))
+
+    def drop_frames(self):
+        """Forget the chunks but keep their layout and errors, once a run that won't reuse them has combined them"""
+        for path, entry in self.entries.items():
+            self.entries[path] = entry._replace(df=None)
+
+    def retain(self, paths) -> int:
+        """Drop the files that are no longer part of the run (deleted, renamed or skipped), return how many"""
+        stale = set(self.entries) - set(paths)
+        for path in stale:
+            del self.entries[path]
+        return len(stale)
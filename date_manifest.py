@@ -0,0 +1,88 @@
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+import utils
+
+
+class FileDateRange(NamedTuple):
+    size: int
+    mtime_ns: int
+    min_date: Optional[str]
+    max_date: Optional[str]
+    n_rows: int
+    source_columns: List[str]
+    version: str
+    errors: List[str]
+    invalid_projects: List[str]
+
+    def overlaps(self, start_date, end_date) -> bool:
+        if self.min_date is None:
+            return False  # no dated work, nothing a date window can pick up
+        return pd.Timestamp(self.max_date) >= start_date and pd.Timestamp(self.min_date) <= end_date
+
+
+class DateRangeManifest:
+    """
+    Min and max work date of every datasheet file, keyed by path and kept current by size and mtime.
+    Lets a run skip the files with no work in its date window. The header layout and preprocessing
+    errors are kept too, so a skipped file is still reported like a read one.
+    """
+
+    def __init__(self, manifest_filepath: str):
+        self.manifest_filepath = manifest_filepath
+        self.entries: Dict[str, FileDateRange] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.manifest_filepath):
+            return
+        try:
+            with open(self.manifest_filepath, "r") as f:
+                self.entries = {path: FileDateRange(**entry) for path, entry in json.load(f).items()}
+        except Exception as e:
+            print(f"Unable to read date range manifest, starting empty --> {e}")
+            self.entries = {}
+
+    def get(self, path: str, stat: Optional[os.stat_result]) -> Optional[FileDateRange]:
+        entry = self.entries.get(path)
+        if entry is None or stat is None or (entry.size, entry.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return entry
+
+    def record(self, path: str, stat: os.stat_result, df: pd.DataFrame, n_rows: int, source_columns, version, errors, invalid_projects):
+        """Record the date range of a preprocessed file"""
+        min_date, max_date = utils.get_work_date_range(df)
+        self.entries[path] = FileDateRange(
+            stat.st_size,
+            stat.st_mtime_ns,
+            None if pd.isna(min_date) else min_date.isoformat(),
+            None if pd.isna(max_date) else max_date.isoformat(),
+            n_rows,
+            list(source_columns),
+            str(version),
+            list(errors),
+            list(invalid_projects),
+        )
+        self._dirty = True
+
+    def save(self):
+        """Drop entries of deleted files and write the manifest to disk"""
+        for path in [p for p in self.entries if not os.path.exists(p)]:
+            del self.entries[path]
+            self._dirty = True
+
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_filepath), exist_ok=True)
+            tmp_filepath = self.manifest_filepath + ".tmp"
+            with open(tmp_filepath, "w") as f:
+                json.dump({path: entry._asdict() for path, entry in self.entries.items()}, f)
+            os.replace(tmp_filepath, self.manifest_filepath)
+            self._dirty = False
+        except Exception as e:
+            print(f"Unable to write date range manifest --> {e}")
@@ -33,7 +33,10 @@ Sub main_run_kpi()
     pythonScriptFullPath = dropbox_root & PATH_SEP & PYTHON_SCRIPT_PATH
     pythonScriptFullPath = UTILS.get_os_path(pythonScriptFullPath)
     
-    returnCode = UTILS.RunPythonScript(CURR_PATH, pythonScriptFullPath)
+    ' a watcher started with "--watch" runs the report itself, a second interpreter would write the same files
+    returnCode = -1
+    If UTILS.watcher_is_running() Then returnCode = UTILS.run_through_watcher()
+    If returnCode = -1 Then returnCode = UTILS.RunPythonScript(CURR_PATH, pythonScriptFullPath)
     
     '---------------------------------------------------------------------
     
@@ -194,6 +194,53 @@ Function windows_run_python(runningDirectoryForPython, scriptFullPath)
     
 End Function
 
+Function watcher_is_running() As Boolean
+
+    ' the watcher touches its heartbeat file every second, a stale file is left over from a watcher that was killed
+    heartbeat_path = get_os_path(WATCH_HEARTBEAT_FILEPATH)
+    
+    watcher_is_running = False
+    If Dir(heartbeat_path) = "" Then Exit Function
+    
+    On Error Resume Next
+    watcher_is_running = DateDiff("s", FileDateTime(heartbeat_path), Now) <= 5
+    On Error GoTo 0
+
+End Function
+
+Function run_through_watcher()
+
+    ' asks the running watcher for one KPI run and waits for its exit code, so that only one python process
+    ' writes the output files. Returns -1 when the watcher went away before answering
+    request_path = get_os_path(WATCH_REQUEST_FILEPATH)
+    done_path = get_os_path(WATCH_DONE_FILEPATH)
+    
+    If Dir(done_path) <> "" Then Kill done_path
+    
+    fileNum = FreeFile
+    Open request_path For Output As #fileNum
+    Close #fileNum
+    
+    Do While Dir(done_path) = ""
+        If watcher_is_running() = False Then
+            If Dir(request_path) <> "" Then Kill request_path
+            run_through_watcher = -1
+            Exit Function
+        End If
+        Application.Wait Now + TimeValue("00:00:01")
+        DoEvents
+    Loop
+    
+    fileNum = FreeFile
+    Open done_path For Input As #fileNum
+        Line Input #fileNum, textline
+    Close #fileNum
+    Kill done_path
+    
+    run_through_watcher = CInt(Trim(textline))
+
+End Function
+
 Function validate_date(date_var)
 
     validate_date = IsDate(date_var)
@@ -13,6 +13,7 @@ Global SHEETS_TO_DELETE As Variant, SHEETS_TO_OVERWRITE As Variant
 Global RANGE_TO_CLEAR As String
 Global PYTHON_ERRORS_RANGE As Range
 Global PYTHON_WARNINGS_RANGE As Range
+Global WATCH_HEARTBEAT_FILEPATH As String, WATCH_REQUEST_FILEPATH As String, WATCH_DONE_FILEPATH As String
 
 Function init()
 
@@ -37,6 +38,11 @@ Function init()
     PYTHON_SCRIPT_PATH = KPI_FOLDER_PATH & "\python_program\KPI_aggregation.py"
     PYTHON_ERRORS_TXT_FILEPATH = CURR_PATH & "/python_program/python_errors.txt"
     PYTHON_WARNINGS_TXT_FILEPATH = CURR_PATH & "/python_program/python_warnings.txt"
+    
+    ' hand-off files of a running "KPI_aggregation.py --watch", same names as WATCH_*_FILENAME in config.py
+    WATCH_HEARTBEAT_FILEPATH = CURR_PATH & "\python_program\intermediate\watch_heartbeat"
+    WATCH_REQUEST_FILEPATH = CURR_PATH & "\python_program\intermediate\watch_run_request"
+    WATCH_DONE_FILEPATH = CURR_PATH & "\python_program\intermediate\watch_run_done"
 
     OVERALL_SUMMARY_SHEETNAME = Trim(WS_DATE_INPUT.Range("overall").Value)
     PHOTOGRAPHY_SUMMARY_SHEETNAME = Trim(WS_DATE_INPUT.Range("photg_summ").Value)
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def get_file_stem(name: str) -> str:
+    """File name without its extension, "xyz.csv.gz" -> "xyz" for compressed files"""
+    stem = Path(name).stem
+    if name.lower().endswith(COMPRESSED_SUFFIXES):
+        stem = Path(stem).stem
+    return stem
+
+
+class CatalogEntry(NamedTuple):
+    path: str
+    name: str
+    stem: str
+    size: int
+    mtime: float
+    stat: os.stat_result
+
+
+class FileCatalog:
+    """
+    Name, stem, size and mtime of the jobsheet files, collected with one os.scandir pass per folder.
+    Shared by the file filtering rules, the ingestion planner and the parse cache so that
+    every file is stat'ed only once per run.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, CatalogEntry] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return path in self.entries
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def scan_folder(self, folder: str, extensions=(".csv",)) -> List[str]:
+        """Add the files of folder with one of the extensions and return their paths"""
+        paths = []
+        with os.scandir(folder) as it:
+            for dir_entry in it:
+                # like glob, skip hidden files (e.g. Dropbox metadata)
+                if dir_entry.name.startswith("."):
+                    continue
+                if not dir_entry.name.lower().endswith(extensions) or not dir_entry.is_file():
+                    continue
+                self._add(dir_entry.path, dir_entry.stat())
+                paths.append(dir_entry.path)
+        return paths
+
+    def add_paths(self, paths) -> List[str]:
+        """Add files given by path, stat'ing the ones not in the catalog yet"""
+        added = []
+        for path in paths:
+            if path not in self.entries:
+                try:
+                    self._add(path, os.stat(path))
+                except OSError:
+                    continue
+            added.append(path)
+        return added
+
+    def _add(self, path: str, stat: os.stat_result):
+        name = os.path.basename(path)
+        self.entries[path] = CatalogEntry(path, name, get_file_stem(name), stat.st_size, stat.st_mtime, stat)
+
+    def get(self, path: str) -> Optional[CatalogEntry]:
+        return self.entries.get(path)
+
+    def stat(self, path: str) -> Optional[os.stat_result]:
+        entry = self.entries.get(path)
+        return entry.stat if entry is not None else None
+
+    def size(self, path: str) -> int:
+        entry = self.entries.get(path)
+        return entry.size if entry is not None else 0
@@ -0,0 +1,80 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+import config
+
+INTEGER_TYPES = [np.int8, np.int16, np.int32, np.int64]
+
+# text repeated on every row of a file
+CATEGORY_COLS = [config.COL_PROJECT_NAME, config.COL_FILETAG, config.COL_JOBSHEET_FILEVERSION]
+
+
+def get_counter_dtype(df: pd.DataFrame, cols: List[str]):
+    """
+    Smallest integer type holding the sum of all the counters. The summaries add counters up across
+    columns and rows in the counters' own type, a bound on the grand total keeps those sums from overflowing.
+    """
+    bound = sum(float(df[col].abs().sum()) for col in cols)
+    for int_type in INTEGER_TYPES:
+        if bound <= np.iinfo(int_type).max:
+            return int_type
+    return None
+
+
+def compact_dtypes(df: pd.DataFrame) -> List[str]:
+    """
+    Convert df in place to the compact representation: integer counters and categorical project, filetag
+    and version columns. Returns the counter columns left as float (fractional or missing values).
+    """
+    counter_cols, float_cols = [], []
+    for col in config.INTEGER_COLS:
+        if col not in df.columns or not pd.api.types.is_float_dtype(df[col]):
+            continue
+        values = df[col].to_numpy()
+        if np.isfinite(values).all() and (values == np.round(values)).all():
+            counter_cols.append(col)
+        else:
+            float_cols.append(col)
+
+    int_type = get_counter_dtype(df, counter_cols)
+    if int_type is not None:
+        for col in counter_cols:
+            df[col] = df[col].astype(int_type)
+
+    for col in CATEGORY_COLS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    return float_cols
+
+
+class MemoryReport:
+    """Resident size and dtype of every column of a frame, recorded at successive stages of a run"""
+
+    def __init__(self):
+        self.stages: Dict[str, pd.DataFrame] = {}
+
+    def record(self, stage: str, df: pd.DataFrame):
+        self.stages[stage] = pd.DataFrame({"bytes": df.memory_usage(deep=True, index=False), "dtype": df.dtypes.astype(str)})
+
+    def to_frame(self) -> pd.DataFrame:
+        """One row per column (and a total), the size in MB and dtype at each stage"""
+        report = pd.concat(self.stages, axis=1)
+        report.columns = [f"{stage} {field}" for stage, field in report.columns]
+        for stage in self.stages:
+            report[f"{stage} MB"] = (report.pop(f"{stage} bytes") / 2**20).round(3)
+
+        report.loc["TOTAL"] = [round(report[col].sum(), 3) if col.endswith(" MB") else "" for col in report.columns]
+        report.index.name = "Column"
+        return report
+
+    def totals(self) -> str:
+        return ", ".join(f"{stage}: {frame['bytes'].sum() / 2**20:.1f} MB" for stage, frame in self.stages.items())
+
+    def save(self, filepath: str):
+        try:
+            self.to_frame().to_csv(filepath)
+        except Exception as e:
+            print(f"Unable to write the memory report --> {e}")
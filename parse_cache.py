@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+
+class ParseCache:
+    """
+    Per-file cache of parsed jobsheet CSVs, kept in the intermediate folder.
+    Each file's renamed frame is stored as parquet and keyed by path, size and mtime,
+    so only new or changed files need to be parsed again.
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, cache_dir: str, reader_key: str = "", dtype_backend: str = None):
+        self.cache_dir = cache_dir
+        self.reader_key = reader_key
+        self.read_kwargs = {"dtype_backend": dtype_backend} if dtype_backend else {}
+        self.index_filepath = os.path.join(cache_dir, self.INDEX_FILENAME)
+        self.index = {}
+        self.hits = 0
+        self.misses = 0
+        self.enabled = True
+        self._dirty = False
+        self._lock = threading.Lock()
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("pyarrow is not installed, parse cache disabled")
+            self.enabled = False
+            return
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_filepath):
+            return
+        try:
+            with open(self.index_filepath, "r") as f:
+                self.index = json.load(f)
+        except Exception as e:
+            print(f"Unable to read parse cache index, starting empty --> {e}")
+            self.index = {}
+
+    def _signature(self, file_path: str, stat=None) -> dict:
+        stat = stat if stat is not None else os.stat(file_path)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "reader_key": self.reader_key}
+
+    def _cache_filepath(self, file_path: str) -> str:
+        digest = hashlib.sha1(file_path.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.parquet")
+
+    def lookup(self, file_path: str, stat=None):
+        """Return the cache file holding an up to date frame for file_path, or None"""
+        if not self.enabled:
+            return None
+
+        entry = self.index.get(os.path.abspath(file_path))
+        try:
+            if entry is None or entry["signature"] != self._signature(file_path, stat):
+                self.misses += 1
+                return None
+        except OSError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["cache_file"]
+
+    def read(self, cache_file: str):
+        """Read a cache file returned by lookup, None if it cannot be read"""
+        try:
+            return pd.read_parquet(cache_file, **self.read_kwargs)
+        except Exception as e:
+            print(f"Unable to read parse cache file '{cache_file}' --> {e}")
+            return None
+
+    def load(self, file_path: str, stat=None):
+        """Return the cached frame for file_path, or None if it is missing or stale"""
+        cache_file = self.lookup(file_path, stat)
+        if cache_file is None:
+            return None
+        return self.read(cache_file)
+
+    def store(self, file_path: str, df: pd.DataFrame, stat=None):
+        """Write the parsed frame for file_path to the cache"""
+        if not self.enabled:
+            return
+
+        file_path = os.path.abspath(file_path)
+        cache_file = self._cache_filepath(file_path)
+        try:
+            signature = self._signature(file_path, stat)
+            df.to_parquet(cache_file, index=False)
+        except Exception as e:
+            # e.g. columns with mixed types that parquet cannot hold, these files are simply re-parsed next time
+            print(f"Unable to cache '{os.path.basename(file_path)}' --> {e}")
+            return
+
+        with self._lock:
+            self.index[file_path] = {"signature": signature, "cache_file": cache_file}
+            self._dirty = True
+
+    def save(self):
+        """Drop entries of deleted files and write the index to disk"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            for file_path in [p for p in self.index if not os.path.exists(p)]:
+                cache_file = self.index.pop(file_path)["cache_file"]
+                if os.path.exists(cache_file):
+                    os.remove(cache_file)
+                self._dirty = True
+
+            if not self._dirty:
+                return
+
+            tmp_filepath = self.index_filepath + ".tmp"
+            with open(tmp_filepath, "w") as f:
+                json.dump(self.index, f)
+            os.replace(tmp_filepath, self.index_filepath)
+            self._dirty = False
+
+        print(f"Parse cache: {self.hits} file(s) loaded from cache, {self.misses} file(s) parsed")
@@ -0,0 +1,96 @@
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Tuple
+
+import pandas as pd
+
+import config
+
+
+class HeaderLayout(NamedTuple):
+    source_columns: Tuple[str, ...]
+    mapped_columns: Tuple[str, ...]
+    rename_map: Mapping[str, str]
+    extra: Tuple[str, ...]
+    missing: Tuple[str, ...]
+    matches: bool
+
+
+@lru_cache(maxsize=None)
+def compile_column_mapping(columns: Tuple[str, ...]) -> Mapping[str, str]:
+    """
+    Legacy column names present in a header and their new names, empty when nothing needs renaming.
+    Read-only, the cached mapping is shared by every file with this header
+    """
+    return MappingProxyType({col: config.BACKWARD_COLUMN_COMPATIBILITY[col] for col in columns if col in config.BACKWARD_COLUMN_COMPATIBILITY})
+
+
+@lru_cache(maxsize=None)
+def resolve_header_layout(source_columns: Tuple[str, ...], cols_expected: Tuple[str, ...] = ()) -> HeaderLayout:
+    """Resolve a header once into its column mapping and validation verdict"""
+    rename_map = compile_column_mapping(source_columns)
+    mapped_columns = tuple(rename_map.get(col, col) for col in source_columns)
+
+    if not cols_expected or mapped_columns == cols_expected:
+        return HeaderLayout(source_columns, mapped_columns, rename_map, (), (), True)
+
+    extra = tuple(set(mapped_columns) - set(cols_expected))
+    missing = tuple(set(cols_expected) - set(mapped_columns))
+    return HeaderLayout(source_columns, mapped_columns, rename_map, extra, missing, False)
+
+
+class SchemaRegistry:
+    """
+    Header layouts seen during ingestion, keyed by header signature and jobsheet_fileversion.
+    Files are batched by layout, so the mapping and the mismatch verdict are worked out
+    once per layout instead of once per file.
+    """
+
+    def __init__(self, cols_expected=()):
+        self.cols_expected = tuple(cols_expected)
+        self.files_by_layout: Dict[Tuple[Tuple[str, ...], str], List[str]] = {}
+        self.files: List[Tuple[str, Tuple[Tuple[str, ...], str]]] = []
+        self.file_order: Dict[str, int] = {}
+
+    def register(self, source_columns, version, filename: str) -> HeaderLayout:
+        source_columns = tuple(source_columns)
+        self.files_by_layout.setdefault((source_columns, version), []).append(filename)
+        self.files.append((filename, (source_columns, version)))
+        return resolve_header_layout(source_columns, self.cols_expected)
+
+    def set_file_order(self, filenames):
+        """Output order of the files, files registered out of band (stored, skipped) are reported in this order"""
+        self.file_order = {}
+        for position, filename in enumerate(filenames):
+            self.file_order.setdefault(filename, position)
+
+    def mismatch_warnings(self) -> List[str]:
+        """One warning per file whose header doesn't match, in file order (registration order by default)"""
+        files = self.files
+        if self.file_order:
+            files = sorted(files, key=lambda entry: self.file_order.get(entry[0], len(self.file_order)))
+
+        warnings = []
+        for filename, (source_columns, version) in files:
+            layout = resolve_header_layout(source_columns, self.cols_expected)
+            if layout.matches:
+                continue
+            warnings.append(
+                f'Check "{filename}" --> Columns mismatch. Extra: "{list(layout.extra)}". Missing: "{list(layout.missing)}". jobsheet version: {version}'
+            )
+        return warnings
+
+    def mapped_columns(self) -> List[str]:
+        """All column names seen across the layouts, after the backward mapping"""
+        columns = {}
+        for source_columns, _ in self.files_by_layout:
+            columns.update(dict.fromkeys(resolve_header_layout(source_columns, self.cols_expected).mapped_columns))
+        return list(columns)
+
+    def summary(self) -> pd.DataFrame:
+        """One row per header layout and jobsheet version"""
+        rows = []
+        for (source_columns, version), filenames in self.files_by_layout.items():
+            layout = resolve_header_layout(source_columns, self.cols_expected)
+            rows.append([version, len(filenames), layout.matches, ", ".join(layout.extra), ", ".join(layout.missing)])
+        return pd.DataFrame(rows, columns=[config.COL_JOBSHEET_FILEVERSION, "files", "matches", "extra", "missing"])
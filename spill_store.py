@@ -0,0 +1,57 @@
+import os
+import shutil
+from typing import Iterator, List
+
+import pandas as pd
+
+import utils
+
+
+class SpillStore:
+    """
+    Preprocessed datasheet chunks spilled to parquet files in the intermediate folder.
+    Used by the memory budget mode: the chunks are streamed back in batches of about
+    budget_bytes, so the full history is never resident at once.
+    """
+
+    def __init__(self, spill_dir: str, budget_bytes: int, dtype_backend: str = None):
+        self.spill_dir = spill_dir
+        self.budget_bytes = budget_bytes
+        self.dtype_backend = dtype_backend
+        self.parts: List[tuple] = []
+        self.columns = {}
+
+        shutil.rmtree(spill_dir, ignore_errors=True)
+        os.makedirs(spill_dir)
+
+    def __len__(self):
+        return len(self.parts)
+
+    def append(self, df: pd.DataFrame):
+        """Write a chunk to disk, the caller can drop its own reference afterwards"""
+        part_filepath = os.path.join(self.spill_dir, f"part-{len(self.parts):05d}.parquet")
+        nbytes = int(df.memory_usage(deep=True).sum())
+        try:
+            df.to_parquet(part_filepath, index=False)
+            self.parts.append((part_filepath, nbytes, None))
+        except Exception as e:
+            # e.g. text left in a counter column, parquet cannot hold mixed types, the chunk stays in memory
+            print(f"Unable to spill a chunk to disk, keeping it in memory --> {e}")
+            self.parts.append((None, nbytes, df))
+        self.columns.update(dict.fromkeys(df.columns))
+
+    def iter_batches(self) -> Iterator[List[pd.DataFrame]]:
+        """Yield the spilled chunks, in the order they were appended, grouped into batches within the budget"""
+        batch, batch_bytes = [], 0
+        for part_filepath, nbytes, df in self.parts:
+            if batch and batch_bytes + nbytes > self.budget_bytes:
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append(df if part_filepath is None else utils.read_preprocessed_parquet(part_filepath, self.dtype_backend))
+            batch_bytes += nbytes
+        if batch:
+            yield batch
+
+    def clear(self):
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
+        self.parts = []
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+
+# values of the sign columns that are not staff, they get the first codes (0 = empty cell)
+RESERVED_VALUES = list(
+    dict.fromkeys(
+        [""]
+        + config.UNMERGE_START_CONST_VALUES
+        + config.PHOTOGRAPHER_SIGN_CONST_VALUES
+        + [config.TO_DUPLICATE_VAL, config.REDUNDANT_VALUE, config.TRANSFER_VALUE]
+    )
+)
+
+
+def normalize_name(value) -> str:
+    return value.strip().lower() if isinstance(value, str) else ""
+
+
+class StaffDictionary:
+    """
+    One code per staff name, shared by all the sign columns. Names are stripped and lower-cased once,
+    when they are first seen, and the sign columns become categoricals over the dictionary, so the
+    role summaries compare integer codes instead of strings.
+    """
+
+    def __init__(self):
+        self.names: List[str] = list(RESERVED_VALUES)
+        self.codes: Dict[str, int] = {name: code for code, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def first_staff_code(self) -> int:
+        return len(RESERVED_VALUES)
+
+    def code(self, name: str) -> Optional[int]:
+        return self.codes.get(normalize_name(name))
+
+    def add(self, values) -> np.ndarray:
+        """Codes of values, names not seen before are appended to the dictionary"""
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            name = normalize_name(value)
+            if name not in self.codes:
+                self.codes[name] = len(self.names)
+                self.names.append(name)
+            codes[i] = self.codes[name]
+        return codes
+
+    def encode(self, df: pd.DataFrame, cols=None):
+        """Replace the sign columns of df by categoricals over the dictionary, in place"""
+        cols = [col for col in (cols or config.STAFF_SIGN_COLS) if col in df.columns]
+
+        # each distinct value is normalized once, then mapped back through the factorize codes
+        col_codes = {}
+        for col in cols:
+            value_codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            col_codes[col] = self.add(uniques)[value_codes]
+
+        categories = pd.Index(self.names, dtype=object)
+        for col, codes in col_codes.items():
+            df[col] = pd.Categorical.from_codes(codes, categories=categories)
+
+
+def get_staff_names(df: pd.DataFrame, cols) -> List[str]:
+    """Names found in cols, column by column in order of appearance, without the empty value"""
+    names = {}
+    for col in cols:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = pd.unique(series.cat.codes.to_numpy())
+            names.update(dict.fromkeys(series.cat.categories[codes[codes >= 0]]))
+        else:
+            names.update(dict.fromkeys(normalize_name(value) for value in series.unique() if isinstance(value, str)))
+    names.pop("", None)
+    return list(names)
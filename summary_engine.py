@@ -0,0 +1,253 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+import config
+import utils
+import work_events
+
+# names that are not credited in the summaries
+PHOTOGRAPHER_SKIPPED_NAMES = [""] + config.UNMERGE_START_CONST_VALUES
+PHOTOSTACKER_SKIPPED_NAMES = ["", config.REDUNDANT_VALUE.lower()] + config.UNMERGE_START_CONST_VALUES
+RETOUCHER_SKIPPED_NAMES = ["", config.TO_DUPLICATE_VAL, config.REDUNDANT_VALUE]
+RETOUCHER_PROJECT_WISE_SKIPPED_NAMES = ["", config.TO_DUPLICATE_VAL]
+
+# period tables: pandas frequency and column label of each granularity
+PERIOD_FREQS = {"week": "W", "month": "M", "quarter": "Q"}
+PERIOD_LABEL_FORMATS = {"week": "w/e %d-%b-%Y", "month": "%b-%Y", "quarter": "Q%q-%Y"}
+
+
+def get_role_events(df: pd.DataFrame, role: str, events: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Work events of a role, events is the table built from df, built here when not given"""
+    if events is None:
+        events = work_events.build_work_events(df)
+    return events[events["role"] == role]
+
+
+def get_events_in_window(events: pd.DataFrame, start_date, end_date) -> pd.DataFrame:
+    """Events whose own slot date is between start_date and end_date"""
+    return events[(events["date"] >= start_date) & (events["date"] <= end_date)]
+
+
+def get_row_ids_in_window(df: pd.DataFrame, date_cols, start_date, end_date) -> np.ndarray:
+    """Row IDs of the rows with a date of date_cols between start_date and end_date"""
+    in_window = np.zeros(len(df), dtype=bool)
+    for col in date_cols:
+        in_window |= ((df[col] >= start_date) & (df[col] <= end_date)).to_numpy()
+    return work_events.get_event_row_ids(df)[in_window]
+
+
+def summarize_staff(events: pd.DataFrame, counters: Dict[str, str], index_name: str, sort_names: bool, project_events=None) -> pd.DataFrame:
+    """
+    One row per staff name: the sum of each counter (renamed to its report column) and the number of projects
+    worked, counted on project_events when given. Names are sorted, or kept in order of appearance.
+    """
+    staff = events["staff"].astype(object)
+    summary = events.groupby(staff, sort=sort_names)[list(counters)].sum().rename(columns=counters)
+
+    if project_events is None:
+        project_events = events
+    projects_worked = project_events.groupby(project_events["staff"].astype(object))["project"].nunique()
+    summary["#_projects_worked"] = projects_worked.reindex(summary.index, fill_value=0).astype(int)
+
+    summary.index.name = index_name
+    return summary
+
+
+def summarize_staff_projects(
+    events: pd.DataFrame, counters: Dict[str, str], index_name: str, start_date, end_date, projects: pd.DataFrame, review: bool = False
+) -> pd.DataFrame:
+    """
+    One row per staff name and project: the sum of each counter and, with review, "Investigate" when a row
+    is flagged for review. The project dates are joined from the project table and the rows are sorted by name
+    then latest project first, projects on the same date keep their order of appearance.
+    """
+    keys = [events["staff"].astype(object).rename(index_name), events["project"].astype(object).rename("Project_name")]
+    grouped = events.groupby(keys, sort=False)
+    summary = grouped[list(counters)].sum().rename(columns=counters)
+    if review:
+        summary["Review"] = np.where(grouped["review"].any(), "Investigate", "")
+
+    summary = summary.reset_index()
+    summary.insert(0, "start_date", start_date)
+    summary.insert(1, "end_date", end_date)
+
+    utils.join_project_dates(summary, projects)
+    summary.sort_values(by=[index_name, "extracted_project_date"], ascending=[True, False], inplace=True)
+    summary.set_index(index_name, inplace=True)
+    return summary
+
+
+def photographers_all_projects(df: pd.DataFrame, include_overall: bool, start_date, end_date, events=None) -> pd.DataFrame:
+    events = get_role_events(df, work_events.ROLE_PHOTOGRAPHER, events)
+    if not include_overall:
+        events = get_events_in_window(events, start_date, end_date)
+    events = events[~events["staff"].isin(PHOTOGRAPHER_SKIPPED_NAMES)]
+
+    # an image is a signed row with items
+    events = events.assign(images=(events["items"] > 0).astype(int))
+    summary = summarize_staff(events, {"items": "Items", "images": "Images"}, "Photographer", sort_names=False)
+    summary.insert(2, "-", "")
+    return summary
+
+
+def photostackers_all_projects(df: pd.DataFrame, include_overall: bool, start_date, end_date, events=None) -> pd.DataFrame:
+    events = get_role_events(df, work_events.ROLE_PHOTOSTACKER, events)
+    if not include_overall:
+        # both slots of a row count once either photostacker date is in the window
+        date_cols = [date_col for _, date_col in work_events.ROLE_SLOTS[work_events.ROLE_PHOTOSTACKER]]
+        events = events[events["row_id"].isin(get_row_ids_in_window(df, date_cols, start_date, end_date))]
+    events = events[~events["staff"].isin(PHOTOSTACKER_SKIPPED_NAMES)]
+
+    counters = {"rename": "Rename", "adjust": "Adjust", "photostack": "Photostack"}
+    return summarize_staff(events, counters, "Photostacker", sort_names=True)
+
+
+def retouchers_all_projects(df: pd.DataFrame, include_overall: bool, start_date, end_date, events=None) -> pd.DataFrame:
+    events = get_role_events(df, work_events.ROLE_RETOUCHER, events)
+    if not include_overall:
+        # all the slots of a row count once any retoucher date is in the window
+        date_cols = [date_col for _, date_col in work_events.ROLE_SLOTS[work_events.ROLE_RETOUCHER]]
+        events = events[events["row_id"].isin(get_row_ids_in_window(df, date_cols, start_date, end_date))]
+    events = events[~events["staff"].isin(RETOUCHER_SKIPPED_NAMES)]
+
+    # the rejected pay rows are zeroed in the events. Like the per name loops, the projects worked
+    # are counted on the first three retoucher slots only
+    counters = {"transfer": "Transfer", "retouches": "Retouches", "variance": "Variance"}
+    return summarize_staff(events, counters, "Retoucher", sort_names=True, project_events=events[events["slot"] <= 3])
+
+
+def photographers_project_wise(df: pd.DataFrame, start_date, end_date, projects: pd.DataFrame, events=None) -> pd.DataFrame:
+    events = get_events_in_window(get_role_events(df, work_events.ROLE_PHOTOGRAPHER, events), start_date, end_date)
+    events = events[~events["staff"].isin(PHOTOGRAPHER_SKIPPED_NAMES)]
+    events = events.assign(images=(events["items"] > 0).astype(int))
+    return summarize_staff_projects(events, {"items": "Items", "images": "Images"}, "Photographer", start_date, end_date, projects)
+
+
+def photostackers_project_wise(df: pd.DataFrame, start_date, end_date, projects: pd.DataFrame, events=None) -> pd.DataFrame:
+    events = get_events_in_window(get_role_events(df, work_events.ROLE_PHOTOSTACKER, events), start_date, end_date)
+    events = events[~events["staff"].isin(PHOTOSTACKER_SKIPPED_NAMES)]
+    counters = {"rename": "Rename", "adjust": "Adjust", "photostack": "Photostack"}
+    return summarize_staff_projects(events, counters, "Photostacker", start_date, end_date, projects, review=True)
+
+
+def retouchers_project_wise(df: pd.DataFrame, start_date, end_date, projects: pd.DataFrame, events=None) -> pd.DataFrame:
+    events = get_events_in_window(get_role_events(df, work_events.ROLE_RETOUCHER, events), start_date, end_date)
+    events = events[~events["staff"].isin(RETOUCHER_PROJECT_WISE_SKIPPED_NAMES)]
+    counters = {"transfer": "Transfer", "retouches": "Retouches", "variance": "Variance"}
+    return summarize_staff_projects(events, counters, "Retoucher", start_date, end_date, projects, review=True)
+
+
+def get_all_periods(dates: pd.Series, granularity: str) -> pd.PeriodIndex:
+    """The periods with a date in dates, in chronological order"""
+    return pd.PeriodIndex(dates.dropna().dt.to_period(PERIOD_FREQS[granularity]).unique()).sort_values()
+
+
+def get_row_periods(df: pd.DataFrame, events: pd.DataFrame, date_col: str, granularity: str) -> pd.Series:
+    """Period of each event taken from the date_col of its row rather than from the slot's own date"""
+    row_periods = pd.Series(df[date_col].dt.to_period(PERIOD_FREQS[granularity]).to_numpy(), index=work_events.get_event_row_ids(df))
+    return events["row_id"].map(row_periods)
+
+
+def label_periods(table: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """Period columns replaced by their labels, e.g. "Jan-2024". Tables of the loop engine are labelled already"""
+    if not isinstance(table.columns, pd.PeriodIndex):
+        return table
+    return table.set_axis(table.columns.strftime(PERIOD_LABEL_FORMATS[granularity]), axis=1)
+
+
+def pivot_by_period(events: pd.DataFrame, periods: pd.Series, all_periods: pd.PeriodIndex, skipped_names, counters: Dict[str, str]):
+    """
+    Staff x period tables, one per counter, added up in a single grouped pass. Rows are the staff names in order
+    of appearance, including the ones without dated work, columns are all_periods. Zero where nothing was done.
+    """
+    staff = events["staff"].astype(object)
+    names = [name for name in pd.unique(staff) if name not in skipped_names]
+
+    dated = periods.notna()
+    sums = events[dated].groupby([staff[dated], periods[dated]])[list(counters)].sum()
+
+    tables = []
+    for counter, index_name in counters.items():
+        table = sums[counter].unstack(fill_value=0).reindex(index=names, columns=all_periods, fill_value=0)
+        values = table.to_numpy()
+        if np.array_equal(values, np.round(values)):
+            table = table.astype("int64")
+        table.index.name = index_name
+        table.columns.name = None
+        tables.append(table)
+    return tables
+
+
+def photographers_by_period(df: pd.DataFrame, granularity: str, events=None) -> pd.DataFrame:
+    events = get_role_events(df, work_events.ROLE_PHOTOGRAPHER, events)
+    periods = events["date"].dt.to_period(PERIOD_FREQS[granularity])
+    all_periods = get_all_periods(df[config.COL_PHOTOGRAPHER_DATE], granularity)
+    (items,) = pivot_by_period(events, periods, all_periods, PHOTOGRAPHER_SKIPPED_NAMES, {"items": "Items"})
+    return items
+
+
+def photostackers_by_period(df: pd.DataFrame, granularity: str, events=None):
+    # work of both slots goes to the period of the first photostacker date, a row counts once per name
+    events = get_role_events(df, work_events.ROLE_PHOTOSTACKER, events).drop_duplicates(subset=["staff", "row_id"])
+    periods = get_row_periods(df, events, config.COL_PHOTOSTACKER_DATE_1, granularity)
+    all_periods = get_all_periods(df[config.COL_PHOTOSTACKER_DATE_1], granularity)
+    counters = {"rename": "Rename", "adjust": "Adjust", "photostack": "Photostack"}
+    return tuple(pivot_by_period(events, periods, all_periods, PHOTOSTACKER_SKIPPED_NAMES, counters))
+
+
+def retouchers_by_period(df: pd.DataFrame, granularity: str, events=None):
+    # work of all the slots goes to the period of the first retoucher date
+    events = get_role_events(df, work_events.ROLE_RETOUCHER, events)
+    periods = get_row_periods(df, events, config.COL_DATE_DONE_RETOUCHERS_SIGN_1, granularity)
+    all_periods = get_all_periods(df[config.COL_DATE_DONE_RETOUCHERS_SIGN_1], granularity)
+    counters = {"transfer": "Transfer", "retouches": "Retouches", "variance": "Variance"}
+    return tuple(pivot_by_period(events, periods, all_periods, RETOUCHER_SKIPPED_NAMES, counters))
+
+
+def join_staff_names(df: pd.DataFrame, group_codes: np.ndarray, n_groups: int, cols) -> pd.Series:
+    """
+    The names signed in cols for each group of rows, joined with ", ". Like get_staff_names: column by column
+    in order of appearance, without the empty value.
+    """
+    names = pd.concat([pd.DataFrame({"group": group_codes, "name": df[col].to_numpy(dtype=object)}) for col in cols], ignore_index=True)
+    names = names[(names["group"] >= 0) & names["name"].notna() & (names["name"] != "")].drop_duplicates()
+    return names.groupby("group")["name"].agg(", ".join).reindex(range(n_groups), fill_value="")
+
+
+def photography_project_wise(df: pd.DataFrame, include_overall: bool, start_date, end_date, projects: pd.DataFrame) -> pd.DataFrame:
+    if not include_overall:
+        df = df[(df[config.COL_PHOTOGRAPHER_DATE] >= start_date) & (df[config.COL_PHOTOGRAPHER_DATE] <= end_date)]
+
+    # transferred rows, and rows signed by the same placeholder (cv, na, ...) in all the photographer slots, bring no items
+    p1, p2, p3 = (df[col].to_numpy(dtype=object) for col in config.PHOTOGRAPHER_SIGN_COLS)
+    skipped = (df[config.COL_UNMERGE_START] == config.TRANSFER_VALUE).to_numpy() | (
+        (p1 == p2) & (p2 == p3) & np.isin(p1, config.PHOTOGRAPHER_SIGN_CONST_VALUES)
+    )
+    item_cols = [config.COL_PHOTOGRAPHY, config.COL_BESPOKE, config.COL_CAPPED, config.COL_PHOTOGRAPHY_TO_VARIANCE, config.COL_SAMPLES_RESTAKE]
+    row_items = np.where(skipped, 0.0, df[item_cols].sum(axis=1).to_numpy())
+
+    rows = pd.DataFrame(
+        {
+            "Photography_date": df[config.COL_PHOTOGRAPHER_DATE].to_numpy(),
+            "Project_name": df[config.COL_PROJECT_NAME].to_numpy(dtype=object),
+            "Items": row_items,
+            "Images": (row_items > 0).astype(int),
+        }
+    )
+    grouped = rows.groupby(["Photography_date", "Project_name"])
+    summary = grouped[["Items", "Images"]].sum().reset_index()
+
+    group_codes = grouped.ngroup().to_numpy()
+    for col, sign_cols in [
+        ("Photographers", config.PHOTOGRAPHER_SIGN_COLS),
+        ("Photostackers", config.PHOTOSTACKER_SIGN_COLS),
+        ("Retouchers", config.RETOUCHER_SIGN_COLS),
+    ]:
+        summary[col] = join_staff_names(df, group_codes, len(summary), sign_cols).to_numpy()
+
+    utils.join_project_dates(summary, projects)
+    summary["Photography_date"] = utils.convert_df_col_to_date(summary["Photography_date"])
+    summary.sort_values(by=["Photography_date", "extracted_project_date"], ascending=[False, False], inplace=True)
+    return summary
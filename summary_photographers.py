@@ -3,7 +3,9 @@ from pandas import DataFrame
 import pandas as pd
 
 import config
+import summary_engine
 import utils
+from staff_dictionary import get_staff_names
 
 
 def calc_photographers(df: DataFrame) -> tuple[int, int]:
@@ -34,24 +36,13 @@ def calc_photographers(df: DataFrame) -> tuple[int, int]:
 
 
 def get_all_photographer_names(df: DataFrame):
+    return get_staff_names(df, config.PHOTOGRAPHER_SIGN_COLS)
 
-    p1_sign_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOGRAPHER_1)
-    p2_sign_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOGRAPHER_2)
-    p3_sign_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOGRAPHER_3)
 
-    all_photographer_names = p1_sign_names + p2_sign_names + p3_sign_names
+def summary_of_photographers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date, events: DataFrame = None):
 
-    # Normalize: strip leading/trailing whitespace
-    all_photographer_names = [name.strip().lower() for name in all_photographer_names if isinstance(name, str)]
-
-    # dropping duplicates while maintaining order
-    all_photographer_names = list(dict.fromkeys(all_photographer_names))
-    all_photographer_names = utils.remove_empty_str_values(all_photographer_names)
-
-    return all_photographer_names
-
-
-def summary_of_photographers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date):
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photographers_all_projects(df, include_overall, start_date, end_date, events)
 
     cols = ["Photographer", "Items", "Images", "-", "#_projects_worked"]
     df_photographers = utils.get_empty_df(cols)
@@ -97,10 +88,16 @@ def summary_of_photographers_all_projects(df: DataFrame, include_overall: bool,
 # Summary of Photographers - Project Wise
 
 
-def summary_of_photographers_project_wise(df: DataFrame, start_date, end_date):
+def summary_of_photographers_project_wise(df: DataFrame, start_date, end_date, projects: DataFrame = None, events: DataFrame = None):
 
-    # make an empty output Dataframe
-    cols = ["start_date", "end_date", "Photographer", "Project_name", "Items", "Images", "extracted_project_date"]
+    if projects is None:
+        projects = utils.build_project_table(df)
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photographers_project_wise(df, start_date, end_date, projects, events)
+
+    # make an empty output Dataframe, extracted_project_date is joined from the project table
+    cols = ["start_date", "end_date", "Photographer", "Project_name", "Items", "Images"]
     df_photographers_project_wise = utils.get_empty_df(cols)
 
     df_date_filtered = utils.filter_df_on_dates(df, start_date, end_date, config.COL_PHOTOGRAPHER_DATE)
@@ -144,16 +141,20 @@ def summary_of_photographers_project_wise(df: DataFrame, start_date, end_date):
                 project_name,
                 photographer_items,
                 photographer_images,
-                concat_df.loc[concat_df[config.COL_PROJECT_NAME] == project_name, "extracted_project_date"].iloc[0]
             ]
 
+    utils.join_project_dates(df_photographers_project_wise, projects)
     df_photographers_project_wise.sort_values(by=["Photographer", "extracted_project_date"], ascending=[True, False], inplace=True)
     df_photographers_project_wise.set_index("Photographer", inplace=True)
 
     return df_photographers_project_wise
 
 
-def summary_of_photographers_by_month(df: pd.DataFrame):
+def summary_of_photographers_by_month(df: pd.DataFrame, events: pd.DataFrame = None):
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photographers_by_period(df, config.MONTH_WISE_PERIOD, events)
+
     # Filter by Photographer Date
     print("Generating month-wise summary for photographers...")
 
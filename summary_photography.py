@@ -1,6 +1,7 @@
 from pandas import DataFrame
 
 import config
+import summary_engine
 import utils
 from summary_photographers import get_all_photographer_names
 from summary_photostackers import get_all_photostackers_names
@@ -59,16 +60,23 @@ def summary_of_photography(df: DataFrame):
     return df_photography_summary
 
 
-def summary_of_photography_project_wise(df: DataFrame, include_overall: bool, start_date, end_date) -> DataFrame:
+def summary_of_photography_project_wise(df: DataFrame, include_overall: bool, start_date, end_date, projects: DataFrame = None) -> DataFrame:
 
-    cols = ["Photography_date", "Project_name", "Items", "Images", "Photographers", "Photostackers", "Retouchers", "extracted_project_date"]
+    if projects is None:
+        projects = utils.build_project_table(df)
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photography_project_wise(df, include_overall, start_date, end_date, projects)
+
+    # extracted_project_date is joined from the project table
+    cols = ["Photography_date", "Project_name", "Items", "Images", "Photographers", "Photostackers", "Retouchers"]
     df_photography_summary_project_wise = utils.get_empty_df(cols)
 
     if not include_overall:
         df = utils.filter_df_on_dates(df, start_date, end_date, config.COL_PHOTOGRAPHER_DATE)
         df.reset_index(drop=True, inplace=True)
 
-    for (photography_date, project_name), group in df.groupby([config.COL_PHOTOGRAPHER_DATE, config.COL_PROJECT_NAME]):
+    for (photography_date, project_name), group in df.groupby([config.COL_PHOTOGRAPHER_DATE, config.COL_PROJECT_NAME], observed=True):
 
         if not photography_date:
             continue
@@ -119,9 +127,9 @@ def summary_of_photography_project_wise(df: DataFrame, include_overall: bool, st
             ", ".join(all_photographer_names),
             ", ".join(all_photostackers_names),
             ", ".join(all_retouchers_names),
-            df.loc[df[config.COL_PROJECT_NAME] == project_name, "extracted_project_date"].iloc[0],
         ]
 
+    utils.join_project_dates(df_photography_summary_project_wise, projects)
     df_photography_summary_project_wise["Photography_date"] = utils.convert_df_col_to_date(df_photography_summary_project_wise["Photography_date"])
     df_photography_summary_project_wise["Items"] = utils.convert_df_col_to_numeric(df_photography_summary_project_wise["Items"])
     df_photography_summary_project_wise["Images"] = utils.convert_df_col_to_numeric(df_photography_summary_project_wise["Images"])
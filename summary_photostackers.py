@@ -2,28 +2,19 @@ from pandas import DataFrame
 import pandas as pd
 
 import config
+import summary_engine
 import utils
+from staff_dictionary import get_staff_names
 
 
 def get_all_photostackers_names(df):
+    return get_staff_names(df, config.PHOTOSTACKER_SIGN_COLS)
 
-    p1_sign_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOSTACKER_SIGN_1)
-    p2_sign_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOSTACKER_SIGN_2)
-    # p2_sign_names = []
 
-    all_photostacker_names = p1_sign_names + p2_sign_names
+def summary_of_photostackers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date, events: DataFrame = None):
 
-    # Normalize: strip leading/trailing whitespace
-    all_photostacker_names = [name.strip().lower() for name in all_photostacker_names if isinstance(name, str)]
-
-    all_photostacker_names = list(dict.fromkeys(all_photostacker_names))
-
-    # photostacker_names = utils.df_column_to_uniques_list(df, config.COL_PHOTOSTACKER_SIGN)
-    all_photostacker_names = utils.remove_empty_str_values(all_photostacker_names)
-    return all_photostacker_names
-
-
-def summary_of_photostackers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date):
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photostackers_all_projects(df, include_overall, start_date, end_date, events)
 
     if not include_overall:
         # don't include the overall dates, rather use the start and end date provided by
@@ -32,7 +23,7 @@ def summary_of_photostackers_all_projects(df: DataFrame, include_overall: bool,
         temp_df_date2_filtered = utils.filter_df_on_dates(df, start_date, end_date, config.COL_PHOTOSTACKER_DATE_2)
 
         df = utils.concat_dfs([temp_df_date1_filtered, temp_df_date2_filtered])
-        df = df.drop_duplicates()  # Remove duplicate rows in case they were filtered out
+        df = utils.drop_duplicate_rows(df)  # Remove duplicate rows in case they were filtered out
         df.reset_index(drop=True, inplace=True)
 
     # make an empty dataframe with these columns
@@ -73,12 +64,21 @@ def summary_of_photostackers_all_projects(df: DataFrame, include_overall: bool,
 # Summary of "Photostackers" - Project Wise
 
 
-def summary_of_photostackers_project_wise(df, start_date, end_date):
+def summary_of_photostackers_project_wise(df, start_date, end_date, projects: DataFrame = None, events: DataFrame = None):
+
+    if projects is None:
+        projects = utils.build_project_table(df)
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photostackers_project_wise(df, start_date, end_date, projects, events)
+
+    # rows flagged for review, searched once rather than in every project slice
+    review_rows = df[config.COL_WARNINGS].str.contains(config.REVIEW_PHOTOSTACKER, na=False)
 
     # df_date_filtered = utils.filter_df_on_dates(df, start_date, end_date, config.COL_PHOTOSTACKER_DATE)
     # grouped_project_wise_df = df_date_filtered.groupby([config.COL_PHOTOSTACKER_SIGN, config.COL_PROJECT_NAME])
 
-    cols = ["start_date", "end_date", "Photostacker", "Project_name", "Rename", "Adjust", "Photostack", "Review", "extracted_project_date"]
+    cols = ["start_date", "end_date", "Photostacker", "Project_name", "Rename", "Adjust", "Photostack", "Review"]
     df_photostacker_project_wise = utils.get_empty_df(cols)
 
     all_photostacker_names = get_all_photostackers_names(df)
@@ -98,7 +98,7 @@ def summary_of_photostackers_project_wise(df, start_date, end_date):
         p2_df_filtered = utils.filter_df_on_dates(p2_df, start_date, end_date, config.COL_PHOTOSTACKER_DATE_2)
 
         concat_df = utils.concat_dfs([p1_df_filtered, p2_df_filtered])
-        concat_df = concat_df.drop_duplicates()  # Remove duplicate rows in case they were filtered out
+        concat_df = utils.drop_duplicate_rows(concat_df)  # Remove duplicate rows in case they were filtered out
 
         photostacker_unique_projects = utils.df_column_to_uniques_list(concat_df, config.COL_PROJECT_NAME)
 
@@ -115,7 +115,7 @@ def summary_of_photostackers_project_wise(df, start_date, end_date):
                 photostack += utils.sum_df_on_a_column(temp_df, config.COL_PHOTOSTACK)
 
             temp_concat_df: DataFrame = utils.concat_dfs([p1_project_filtered_df, p2_project_filtered_df])
-            review = temp_concat_df[config.COL_WARNINGS].str.contains(config.REVIEW_PHOTOSTACKER).any()
+            review = review_rows.loc[temp_concat_df.index].any()
             review = "Investigate" if (review == True) else ""
 
             df_photostacker_project_wise.loc[len(df_photostacker_project_wise)] = [
@@ -127,16 +127,20 @@ def summary_of_photostackers_project_wise(df, start_date, end_date):
                 adjust,
                 photostack,
                 review,
-                temp_concat_df.loc[temp_concat_df[config.COL_PROJECT_NAME] == project_name, "extracted_project_date"].iloc[0],
             ]
 
+    utils.join_project_dates(df_photostacker_project_wise, projects)
     df_photostacker_project_wise.sort_values(by=["Photostacker", "extracted_project_date"], ascending=[True, False], inplace=True)
     df_photostacker_project_wise.set_index("Photostacker", inplace=True)
 
     return df_photostacker_project_wise
 
 
-def summary_of_photostackers_by_month(df: DataFrame) -> tuple[DataFrame, DataFrame, DataFrame]:
+def summary_of_photostackers_by_month(df: DataFrame, events: DataFrame = None) -> tuple[DataFrame, DataFrame, DataFrame]:
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.photostackers_by_period(df, config.MONTH_WISE_PERIOD, events)
+
     print("Generating month-wise summary for photostackers...")
 
     # Convert dates to datetime and prepare month col (using DATE_1 only)
@@ -162,7 +166,7 @@ def summary_of_photostackers_by_month(df: DataFrame) -> tuple[DataFrame, DataFra
             p1_df = utils.filter_df_on_column_value(month_df, config.COL_PHOTOSTACKER_SIGN_1, p_name)
             p2_df = utils.filter_df_on_column_value(month_df, config.COL_PHOTOSTACKER_SIGN_2, p_name)
             combined_df = pd.concat([p1_df, p2_df], ignore_index=True)
-            combined_df = combined_df.drop_duplicates()  # Remove duplicate rows in case they were filtered out
+            combined_df = utils.drop_duplicate_rows(combined_df)  # Remove duplicate rows in case they were filtered out
 
             df_rename.loc[p_name, month] = utils.sum_df_on_a_column(combined_df, config.COL_RENAME)
             df_adjust.loc[p_name, month] = utils.sum_df_on_a_column(combined_df, config.COL_ADJUST)
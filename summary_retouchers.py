@@ -2,7 +2,9 @@ from pandas import DataFrame
 import pandas as pd
 
 import config
+import summary_engine
 import utils
+from staff_dictionary import get_staff_names
 
 # Summary of Retouchers - All projects combined
 
@@ -39,22 +41,13 @@ def calc_retouches(df: DataFrame) -> tuple[int, int, int]:
 
 
 def get_all_retoucher_names(df):
+    return get_staff_names(df, config.RETOUCHER_SIGN_COLS)
 
-    r1_sign_names = utils.df_column_to_uniques_list(df, config.COL_RETOUCHERS_SIGN_1)
-    r2_sign_names = utils.df_column_to_uniques_list(df, config.COL_RETOUCHERS_SIGN_2)
-    r3_sign_names = utils.df_column_to_uniques_list(df, config.COL_RETOUCHERS_SIGN_3)
-    r4_sign_names = utils.df_column_to_uniques_list(df, config.COL_RETOUCHERS_SIGN_4)
-    r5_sign_names = utils.df_column_to_uniques_list(df, config.COL_RETOUCHERS_SIGN_5)
 
-    all_retoucher_names = r1_sign_names + r2_sign_names + r3_sign_names + r4_sign_names + r5_sign_names
-    all_retoucher_names = [name.strip().lower() for name in all_retoucher_names if isinstance(name, str)]
+def summary_of_retouchers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date, events: DataFrame = None):
 
-    all_retoucher_names = list(dict.fromkeys(all_retoucher_names))
-    all_retoucher_names = utils.remove_empty_str_values(all_retoucher_names)
-    return all_retoucher_names
-
-
-def summary_of_retouchers_all_projects(df: DataFrame, include_overall: bool, start_date, end_date):
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.retouchers_all_projects(df, include_overall, start_date, end_date, events)
 
     df_date_filtered: DataFrame = df.copy()
 
@@ -76,7 +69,7 @@ def summary_of_retouchers_all_projects(df: DataFrame, include_overall: bool, sta
                 temp_df_date5_filtered,
             ]
         )
-        df_date_filtered = df_date_filtered.drop_duplicates()
+        df_date_filtered = utils.drop_duplicate_rows(df_date_filtered)
         df_date_filtered.reset_index(drop=True, inplace=True)
 
     cols = ["Retoucher", "Transfer", "Retouches", "Variance", "#_projects_worked"]
@@ -123,9 +116,18 @@ def summary_of_retouchers_all_projects(df: DataFrame, include_overall: bool, sta
 # Summary of Retouchers - Project wise
 
 
-def summary_of_retouchers_project_wise(df, start_date, end_date):
+def summary_of_retouchers_project_wise(df, start_date, end_date, projects: DataFrame = None, events: DataFrame = None):
+
+    if projects is None:
+        projects = utils.build_project_table(df)
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.retouchers_project_wise(df, start_date, end_date, projects, events)
 
-    cols = ["start_date", "end_date", "Retoucher", "Project_name", "Transfer", "Retouches", "Variance", "Review", "extracted_project_date"]
+    # rows flagged for review, searched once rather than in every project slice
+    review_rows = df[config.COL_WARNINGS].str.contains(config.REVIEW_RETOUCHER, na=False)
+
+    cols = ["start_date", "end_date", "Retoucher", "Project_name", "Transfer", "Retouches", "Variance", "Review"]
     df_retouchers_signed_project_wise = utils.get_empty_df(cols)
 
     all_retoucher_names = get_all_retoucher_names(df)
@@ -148,7 +150,7 @@ def summary_of_retouchers_project_wise(df, start_date, end_date):
         r5_df_filtered = utils.filter_df_on_dates(r5_df, start_date, end_date, config.COL_DATE_DONE_RETOUCHERS_SIGN_5)
 
         concat_df = utils.concat_dfs([r1_df_filtered, r2_df_filtered, r3_df_filtered, r4_df_filtered, r5_df_filtered])
-        concat_df = concat_df.drop_duplicates()
+        concat_df = utils.drop_duplicate_rows(concat_df)
 
         retoucher_unique_projects = utils.df_column_to_uniques_list(concat_df, config.COL_PROJECT_NAME)
 
@@ -184,8 +186,8 @@ def summary_of_retouchers_project_wise(df, start_date, end_date):
                     r5_project_filtered_df,
                 ]
             )
-            temp_concat_df = temp_concat_df.drop_duplicates()
-            review = temp_concat_df[config.COL_WARNINGS].str.contains(config.REVIEW_RETOUCHER).any()
+            temp_concat_df = utils.drop_duplicate_rows(temp_concat_df)
+            review = review_rows.loc[temp_concat_df.index].any()
             review = "Investigate" if (review == True) else ""
 
             df_retouchers_signed_project_wise.loc[len(df_retouchers_signed_project_wise)] = [
@@ -197,9 +199,9 @@ def summary_of_retouchers_project_wise(df, start_date, end_date):
                 retouches,
                 variance,
                 review,
-                temp_concat_df.loc[temp_concat_df[config.COL_PROJECT_NAME] == project_name, "extracted_project_date"].iloc[0]
             ]
 
+    utils.join_project_dates(df_retouchers_signed_project_wise, projects)
     df_retouchers_signed_project_wise.sort_values(by=["Retoucher", "extracted_project_date"], ascending=[True, False], inplace=True)
     df_retouchers_signed_project_wise.set_index("Retoucher", inplace=True)
 
@@ -209,7 +211,11 @@ def summary_of_retouchers_project_wise(df, start_date, end_date):
 # --------------------------------------------------------------------------------------------------
 
 
-def summary_of_retouchers_by_month(df: DataFrame) -> tuple[DataFrame, DataFrame, DataFrame]:
+def summary_of_retouchers_by_month(df: DataFrame, events: DataFrame = None) -> tuple[DataFrame, DataFrame, DataFrame]:
+
+    if config.SUMMARY_ENGINE == "groupby":
+        return summary_engine.retouchers_by_period(df, config.MONTH_WISE_PERIOD, events)
+
     print("Generating month-wise summary for retouchers...")
 
     # Use DATE_1 column to generate month (for grouping)
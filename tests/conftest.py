@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+import memory_diet
+
+NAMES = ["ann", "bob", "cid", "dan", "", "", "cv", "na", "transfer", "redundant", "to duplicate"]
+SIGN_COLS = config.PHOTOGRAPHER_SIGN_COLS + config.PHOTOSTACKER_SIGN_COLS + config.RETOUCHER_SIGN_COLS
+DATE_COLS = [
+    config.COL_PHOTOGRAPHER_DATE,
+    config.COL_PHOTOSTACKER_DATE_1,
+    config.COL_PHOTOSTACKER_DATE_2,
+    config.COL_DATE_DONE_RETOUCHERS_SIGN_1,
+    config.COL_DATE_DONE_RETOUCHERS_SIGN_2,
+    config.COL_DATE_DONE_RETOUCHERS_SIGN_3,
+    config.COL_DATE_DONE_RETOUCHERS_SIGN_4,
+    config.COL_DATE_DONE_RETOUCHERS_SIGN_5,
+]
+COUNTER_COLS = [
+    config.COL_PHOTOGRAPHY,
+    config.COL_BESPOKE,
+    config.COL_PHOTOGRAPHY_TO_VARIANCE,
+    config.COL_SAMPLES_RESTAKE,
+    config.COL_RENAME,
+    config.COL_ADJUST,
+    config.COL_PHOTOSTACK,
+    config.COL_TRANSFER,
+    config.COL_SUPERIMPOSE,
+    config.COL_CAPPED,
+    config.COL_VARIANCE,
+    config.COL_COMBINE,
+]
+
+
+def build_summary_frame(n_rows=300, seed=7, compact=False):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2024-01-01", "2024-03-31")
+    df = pd.DataFrame({config.COL_PROJECT_NAME: rng.choice([f"p{i}" for i in range(12)], n_rows)})
+    # several projects share a date, their order in the project-wise reports must hold too
+    df["extracted_project_date"] = pd.to_datetime("2023-12-01") + pd.to_timedelta(df[config.COL_PROJECT_NAME].str[1:].astype(int) % 4, unit="D")
+    for col in SIGN_COLS:
+        df[col] = rng.choice(NAMES, n_rows)
+    for col in DATE_COLS:
+        dates = pd.Series(rng.choice(days, n_rows))
+        df[col] = dates.mask(rng.random(n_rows) < 0.2)
+    for col in COUNTER_COLS:
+        df[col] = rng.integers(0, 3, n_rows).astype(float)
+    df[config.COL_REJECT_RETOUCHERS_PAY] = rng.choice(["", "y"], n_rows, p=[0.8, 0.2])
+    df[config.COL_WARNINGS] = rng.choice(["", config.REVIEW_PHOTOSTACKER, config.REVIEW_RETOUCHER], n_rows, p=[0.8, 0.1, 0.1])
+    if compact:
+        # USE_COMPACT_DTYPES: integer counters and a categorical project name
+        memory_diet.compact_dtypes(df)
+    return df
+
+
+@pytest.fixture
+def make_frame():
+    """Random datasheet frames with every sign, date and counter column the summaries read"""
+    return build_summary_frame
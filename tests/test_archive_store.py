@@ -0,0 +1,47 @@
+import pandas as pd
+import pytest
+
+import config
+from archive_store import ArchiveStore, CompactedFile
+
+pytest.importorskip("pyarrow")
+
+
+def test_compact_and_load_prunes_partitions_by_work_dates(tmp_path):
+    df = pd.DataFrame(
+        {
+            config.COL_PROJECT_NAME: ["2023.01.02 a", "2023.06.01 b", "2023.01.05 c"],
+            "extracted_project_date": pd.to_datetime(["2023-01-02", "2023-06-01", "2023-01-05"]),
+            config.COL_PHOTOGRAPHER_DATE: pd.to_datetime(["2023-01-10", "2023-06-10", "2023-02-01"]),
+        }
+    )
+    files = [CompactedFile(f"/x/{n}.csv", 1, 1, 1, [], "v1.71", [], []) for n in range(2)]
+    store = ArchiveStore(str(tmp_path / "store"), "key")
+    store.compact(files, df)
+
+    reloaded = ArchiveStore(str(tmp_path / "store"), "key")
+    assert len(reloaded.partitions) == 2
+    # rows come back in their original order
+    assert reloaded.load()[config.COL_PROJECT_NAME].tolist() == ["2023.01.02 a", "2023.06.01 b", "2023.01.05 c"]
+    assert reloaded.load(pd.Timestamp("2023-01-01"), pd.Timestamp("2023-03-01"))[config.COL_PROJECT_NAME].tolist() == ["2023.01.02 a", "2023.01.05 c"]
+
+    assert not ArchiveStore(str(tmp_path / "store"), "other key").exists
+
+
+def test_load_gives_the_dtypes_of_the_pyarrow_engine(tmp_path):
+    import pyarrow as pa
+
+    df = pd.DataFrame(
+        {
+            config.COL_PROJECT_NAME: pd.Series(["2023.01.02 a", "2023.06.01 b"], dtype=pd.ArrowDtype(pa.string())),
+            config.COL_PHOTOGRAPHER_1: pd.Categorical(["ann", "bob"]),
+            "extracted_project_date": pd.to_datetime(["2023-01-02", "2023-06-01"]),
+        }
+    )
+    store = ArchiveStore(str(tmp_path / "store"), "key", "pyarrow")
+    store.compact([CompactedFile("/x/0.csv", 1, 1, 1, [], "v1.71", [], [])], df)
+
+    loaded = store.load()
+    pd.testing.assert_series_equal(loaded.dtypes, df.dtypes)
+    # concatenated with a freshly read file the columns keep their dtypes
+    assert pd.concat([df, loaded]).dtypes.tolist() == df.dtypes.tolist()
@@ -0,0 +1,51 @@
+import os
+
+import pandas as pd
+import pytest
+
+from datasheet_store import DatasheetStore
+
+
+def test_store_reuses_chunks_until_file_changes(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_text("a\n1")
+    store = DatasheetStore()
+    store.put(str(path), os.stat(path), pd.DataFrame({"a": [1]}), 1, ["a"], "v1.71", [], set())
+
+    assert store.get(str(path), os.stat(path)).n_rows == 1
+
+    path.write_text("a\n1\n2")
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    assert store.get(str(path), os.stat(path)) is None
+
+    assert store.retain([]) == 1
+    assert len(store) == 0
+
+
+def make_datasheet_folder(root, n_files=2):
+    import config
+
+    (root / config.DATESHEETS_FOLDER_NAME).mkdir()
+    (root / config.PYTHON_CODES_FOLDER_NAME / config.INTERMEDIATE_FOLDER_NAME).mkdir(parents=True)
+    for n in range(n_files):
+        df = pd.DataFrame({col: [""] * 3 for col in config.COLS_TO_EXPECT_IN_CSV})
+        df[config.COL_PROJECT_NAME] = f"2024.01.0{n + 1} p{n}"
+        df[config.COL_PHOTOGRAPHER_1] = "ann"
+        df[config.COL_PHOTOGRAPHER_DATE] = "02/01/2024"
+        df.to_csv(root / config.DATESHEETS_FOLDER_NAME / f"job{n}.csv", index=False)
+
+
+@pytest.mark.parametrize("keep", [False, True])
+def test_only_a_passed_in_store_keeps_the_chunks_after_a_run(tmp_path, monkeypatch, keep):
+    from KPI_aggregation import KPIDataProcessor
+
+    make_datasheet_folder(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(KPIDataProcessor, "_load_configuration_data", lambda self: None)
+
+    processor = KPIDataProcessor(DatasheetStore() if keep else None)
+    df, _ = processor.load_data_files(include_archives=False)
+
+    assert len(df) == 6 and len(processor.datasheet_store) == 2
+    # a one-off run holds the combined frame only, the watch mode keeps the chunks for its next run
+    assert all((entry.df is not None) == keep for entry in processor.datasheet_store.entries.values())
@@ -0,0 +1,55 @@
+import os
+
+import pandas as pd
+
+import config
+import summary_engine
+from date_manifest import DateRangeManifest
+
+
+def test_manifest_records_work_date_range_and_survives_reload(tmp_path):
+    csv_path = tmp_path / "a.csv"
+    csv_path.write_text("x")
+    df = pd.DataFrame(
+        {
+            config.COL_PHOTOGRAPHER_DATE: pd.to_datetime(["2024-02-01", None]),
+            config.COL_PHOTOSTACKER_DATE_1: pd.to_datetime(["2024-01-15", "2024-03-01"]),
+        }
+    )
+    manifest = DateRangeManifest(str(tmp_path / "manifest.json"))
+    manifest.record(str(csv_path), os.stat(csv_path), df, 2, ["a"], "v1.71", ["an error"], {"p"})
+    manifest.save()
+
+    entry = DateRangeManifest(str(tmp_path / "manifest.json")).get(str(csv_path), os.stat(csv_path))
+    assert (entry.min_date, entry.max_date) == ("2024-01-15T00:00:00", "2024-03-01T00:00:00")
+    assert entry.errors == ["an error"] and entry.invalid_projects == ["p"]
+    assert entry.overlaps(pd.Timestamp("2024-03-01"), pd.Timestamp("2024-04-01"))
+    assert not entry.overlaps(pd.Timestamp("2024-04-01"), pd.Timestamp("2024-05-01"))
+
+
+def test_pruned_files_only_leave_the_month_wise_periods_outside_the_window(tmp_path, make_frame):
+    # an old file with its work a year before the window and a current one
+    old, current = make_frame(seed=1), make_frame(seed=2)
+    date_cols = [col for col in config.DATE_COLS if col in old.columns]
+    old[date_cols] = old[date_cols] - pd.DateOffset(years=1)
+    start_date, end_date = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-03-01")
+
+    manifest = DateRangeManifest(str(tmp_path / "manifest.json"))
+    kept = []
+    for name, df in [("old.csv", old), ("current.csv", current)]:
+        path = tmp_path / name
+        path.write_text("x")
+        manifest.record(str(path), os.stat(path), df, len(df), [], "v1.71", [], [])
+        if manifest.get(str(path), os.stat(path)).overlaps(start_date, end_date):
+            kept.append(df)
+    assert len(kept) == 1
+
+    full = summary_engine.retouchers_by_period(pd.concat([old, current], ignore_index=True), "month")
+    pruned = summary_engine.retouchers_by_period(pd.concat(kept, ignore_index=True), "month")
+    for full_table, pruned_table in zip(full, pruned):
+        # the months of the current file are unchanged, the months of the skipped one are gone
+        assert pruned_table.columns.tolist() == [p for p in full_table.columns if p.year == 2024]
+        pd.testing.assert_frame_equal(
+            pruned_table.sort_index(), full_table[pruned_table.columns].loc[pruned_table.index].sort_index()
+        )
+        assert full_table.drop(columns=pruned_table.columns).to_numpy().sum() > 0
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+import config
+import memory_diet
+
+
+def test_compact_dtypes_sizes_counters_on_their_grand_total():
+    df = pd.DataFrame(
+        {
+            config.COL_RENAME: [100.0, 27.0],
+            config.COL_ADJUST: [1.0, 0.0],
+            config.COL_PHOTOSTACK: [0.5, 1.0],
+            config.COL_PROJECT_NAME: ["a", "a"],
+        }
+    )
+    float_cols = memory_diet.compact_dtypes(df)
+
+    # 128 in total does not fit int8, whatever the per column maximum
+    assert df[config.COL_RENAME].dtype == df[config.COL_ADJUST].dtype == np.int16
+    assert float_cols == [config.COL_PHOTOSTACK]
+    assert df[config.COL_PHOTOSTACK].dtype == np.float64
+    assert isinstance(df[config.COL_PROJECT_NAME].dtype, pd.CategoricalDtype)
+
+
+def test_memory_report_has_a_row_per_column_and_stage():
+    df = pd.DataFrame({config.COL_RENAME: [1.0, 2.0], config.COL_FILETAG: ["x", "x"]})
+    report = memory_diet.MemoryReport()
+    report.record("combined", df)
+    memory_diet.compact_dtypes(df)
+    report.record("compact", df)
+
+    frame = report.to_frame()
+    assert frame.index.tolist() == [config.COL_RENAME, config.COL_FILETAG, "TOTAL"]
+    assert frame.loc[config.COL_RENAME, "compact dtype"] == "int8"
+    assert frame.loc["TOTAL", "compact MB"] <= frame.loc["TOTAL", "combined MB"]
@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from parse_cache import ParseCache
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+def test_parse_cache_hit_after_store(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    write_csv(csv_path, {"A": [1, 2], "B": ["x", "y"]})
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert cache.load(csv_path) is None
+
+    cache.store(csv_path, pd.read_csv(csv_path))
+    cache.save()
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    df = cache.load(csv_path)
+    assert df is not None
+    assert df["A"].tolist() == [1, 2]
+
+
+def test_parse_cache_miss_when_file_changes(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    write_csv(csv_path, {"A": [1, 2]})
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.store(csv_path, pd.read_csv(csv_path))
+
+    write_csv(csv_path, {"A": [1, 2, 3]})
+    os.utime(csv_path, ns=(0, 0))
+    assert cache.load(csv_path) is None
+
+
+def test_parse_cache_prunes_deleted_files(tmp_path):
+    csv_path = str(tmp_path / "a.csv")
+    write_csv(csv_path, {"A": [1]})
+
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.store(csv_path, pd.read_csv(csv_path))
+    os.remove(csv_path)
+    cache.save()
+
+    assert cache.index == {}
@@ -0,0 +1,43 @@
+import pytest
+
+import config
+from schema_registry import SchemaRegistry, compile_column_mapping, resolve_header_layout
+
+
+def test_resolve_header_layout_maps_legacy_columns():
+    layout = resolve_header_layout(("A", "Unmerge (Start)"), ("A", config.COL_UNMERGE_START))
+    assert layout.matches
+    assert layout.rename_map == {"Unmerge (Start)": config.COL_UNMERGE_START}
+
+
+def test_registry_batches_files_by_layout():
+    registry = SchemaRegistry(["A", "B"])
+    registry.register(["A", "B"], "v1.71", "one.csv")
+    registry.register(["A", "C"], "v1.70", "two.csv")
+    registry.register(["A", "C"], "v1.70", "three.csv")
+
+    assert len(registry.files_by_layout) == 2
+    assert registry.mismatch_warnings() == [
+        'Check "two.csv" --> Columns mismatch. Extra: "[\'C\']". Missing: "[\'B\']". jobsheet version: v1.70',
+        'Check "three.csv" --> Columns mismatch. Extra: "[\'C\']". Missing: "[\'B\']". jobsheet version: v1.70',
+    ]
+    assert registry.mapped_columns() == ["A", "B", "C"]
+    assert registry.summary()["files"].tolist() == [1, 2]
+
+
+def test_cached_mapping_is_read_only():
+    mapping = compile_column_mapping(("A", "Unmerge (Start)"))
+    with pytest.raises(TypeError):
+        mapping["A"] = "B"
+    assert compile_column_mapping(("A", "Unmerge (Start)")) == {"Unmerge (Start)": config.COL_UNMERGE_START}
+
+
+def test_mismatch_warnings_follow_the_file_order():
+    registry = SchemaRegistry(["A", "B"])
+    registry.register(["A", "C"], "v1.70", "b.csv")
+    registry.register(["A", "D"], "v1.69", "c.csv")
+    registry.register(["A", "C"], "v1.70", "a.csv")
+    assert [warning.split('"')[1] for warning in registry.mismatch_warnings()] == ["b.csv", "c.csv", "a.csv"]
+
+    registry.set_file_order(["a.csv", "b.csv", "c.csv"])
+    assert [warning.split('"')[1] for warning in registry.mismatch_warnings()] == ["a.csv", "b.csv", "c.csv"]
@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+from spill_store import SpillStore
+
+pytest.importorskip("pyarrow")
+
+
+def test_spilled_chunks_come_back_in_order_within_the_budget(tmp_path):
+    chunks = [pd.DataFrame({"a": [n] * 100}) for n in range(4)]
+    store = SpillStore(str(tmp_path / "spill"), budget_bytes=int(chunks[0].memory_usage(deep=True).sum() * 2))
+    for chunk in chunks:
+        store.append(chunk)
+
+    batches = list(store.iter_batches())
+
+    assert [len(batch) for batch in batches] == [2, 2]
+    assert [chunk["a"].iloc[0] for batch in batches for chunk in batch] == [0, 1, 2, 3]
+    store.clear()
+    assert not (tmp_path / "spill").exists()
@@ -0,0 +1,33 @@
+import pandas as pd
+
+import config
+from staff_dictionary import RESERVED_VALUES, StaffDictionary, get_staff_names
+
+
+def test_encode_shares_codes_across_sign_columns():
+    df = pd.DataFrame(
+        {
+            config.COL_PHOTOGRAPHER_1: ["bob ", "alice", "cv"],
+            config.COL_PHOTOGRAPHER_2: ["", "Bob", "alice"],
+            config.COL_NOTES_FOR_FJI: ["x", "y", "z"],
+        }
+    )
+    staff = StaffDictionary()
+    staff.encode(df)
+
+    p1_codes = df[config.COL_PHOTOGRAPHER_1].cat.codes.tolist()
+    p2_codes = df[config.COL_PHOTOGRAPHER_2].cat.codes.tolist()
+    assert p1_codes[0] == p2_codes[1] == staff.code("bob") >= staff.first_staff_code
+    assert p1_codes[2] == RESERVED_VALUES.index("cv")
+    assert p2_codes[0] == 0
+    assert df[config.COL_PHOTOGRAPHER_1].tolist() == ["bob", "alice", "cv"]
+    assert df[config.COL_NOTES_FOR_FJI].dtype == object
+
+
+def test_get_staff_names_keeps_order_of_appearance():
+    raw = pd.DataFrame({config.COL_PHOTOGRAPHER_1: ["carl", "", " alice"], config.COL_PHOTOGRAPHER_2: ["alice", "bob", None]})
+    encoded = raw.copy()
+    StaffDictionary().encode(encoded)
+
+    cols = [config.COL_PHOTOGRAPHER_1, config.COL_PHOTOGRAPHER_2]
+    assert get_staff_names(raw, cols) == get_staff_names(encoded, cols) == ["carl", "alice", "bob"]
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+import summary_engine
+import utils
+import work_events
+from summary_photography import summary_of_photography_project_wise
+from summary_photographers import summary_of_photographers_all_projects, summary_of_photographers_by_month, summary_of_photographers_project_wise
+from summary_photostackers import summary_of_photostackers_all_projects, summary_of_photostackers_by_month, summary_of_photostackers_project_wise
+from summary_retouchers import summary_of_retouchers_all_projects, summary_of_retouchers_by_month, summary_of_retouchers_project_wise
+
+
+@pytest.mark.parametrize(
+    "summary_of_all_projects",
+    [summary_of_photographers_all_projects, summary_of_photostackers_all_projects, summary_of_retouchers_all_projects],
+)
+@pytest.mark.parametrize("include_overall", [True, False])
+@pytest.mark.parametrize("compact", [False, True])
+def test_groupby_engine_matches_the_loops(monkeypatch, summary_of_all_projects, include_overall, compact, make_frame):
+    df = make_frame(compact=compact)
+    start_date, end_date = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29")
+
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "loop")
+    expected = summary_of_all_projects(df, include_overall, start_date, end_date)
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "groupby")
+    result = summary_of_all_projects(df, include_overall, start_date, end_date)
+
+    assert len(result) > 0
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "summary_project_wise",
+    [summary_of_photographers_project_wise, summary_of_photostackers_project_wise, summary_of_retouchers_project_wise],
+)
+@pytest.mark.parametrize("compact", [False, True])
+def test_groupby_engine_matches_the_loops_project_wise(monkeypatch, summary_project_wise, compact, make_frame):
+    df = make_frame(compact=compact)
+    start_date, end_date = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29")
+
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "loop")
+    expected = summary_project_wise(df, start_date, end_date)
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "groupby")
+    result = summary_project_wise(df, start_date, end_date)
+
+    assert len(result) > 0
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize(
+    "summary_by_month",
+    [summary_of_photographers_by_month, summary_of_photostackers_by_month, summary_of_retouchers_by_month],
+)
+@pytest.mark.parametrize("compact", [False, True])
+def test_groupby_engine_matches_the_loops_by_month(monkeypatch, summary_by_month, compact, make_frame):
+    df = make_frame(compact=compact)
+
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "loop")
+    expected = summary_by_month(df.copy())
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "groupby")
+    result = summary_by_month(df)
+
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    result = result if isinstance(result, tuple) else (result,)
+    for result_table, expected_table in zip(result, expected):
+        pd.testing.assert_frame_equal(summary_engine.label_periods(result_table, "month"), expected_table)
+
+
+def test_quarters_add_up_the_months(make_frame):
+    df = make_frame()
+    months = summary_engine.retouchers_by_period(df, "month")[1]
+    quarters = summary_engine.retouchers_by_period(df, "quarter")[1]
+
+    assert summary_engine.label_periods(quarters, "quarter").columns.tolist() == ["Q1-2024"]
+    assert quarters.iloc[:, 0].tolist() == months.sum(axis=1).tolist()
+    assert months.columns.is_monotonic_increasing
+
+
+@pytest.mark.parametrize("include_overall", [True, False])
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.filterwarnings("error::FutureWarning")  # the loops group by the categorical project name
+def test_groupby_engine_matches_the_loops_photography(monkeypatch, include_overall, compact, make_frame):
+    df = make_frame(compact=compact)
+    df[config.COL_UNMERGE_START] = np.where(np.arange(len(df)) % 7 == 0, config.TRANSFER_VALUE, "")
+    df.loc[::5, config.PHOTOGRAPHER_SIGN_COLS] = "cv"
+    start_date, end_date = pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29")
+
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "loop")
+    expected = summary_of_photography_project_wise(df, include_overall, start_date, end_date)
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", "groupby")
+    result = summary_of_photography_project_wise(df, include_overall, start_date, end_date)
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("engine", ["groupby", "loop"])
+@pytest.mark.parametrize(
+    "summary_by_month, role",
+    [
+        (summary_of_photographers_by_month, work_events.ROLE_PHOTOGRAPHER),
+        (summary_of_photostackers_by_month, work_events.ROLE_PHOTOSTACKER),
+        (summary_of_retouchers_by_month, work_events.ROLE_RETOUCHER),
+    ],
+)
+def test_month_wise_tables_added_up_by_batch_match_one_pass(monkeypatch, engine, summary_by_month, role, make_frame):
+    # the memory budget mode builds the month-wise tables batch by batch
+    monkeypatch.setattr(config, "SUMMARY_ENGINE", engine)
+    df = make_frame()
+    # eve is signed in the second slot of the first batch and in the first slot of the fourth, fay in the first
+    # slot of the second batch only: signed by slot then row, fay comes before eve
+    first_slot, second_slot = (sign_col for sign_col, _ in work_events.ROLE_SLOTS[role][:2])
+    df.loc[5, second_slot] = df.loc[220, first_slot] = "eve"
+    df.loc[100, first_slot] = "fay"
+    expected = summary_by_month(df.copy())
+
+    batches, staff_order = [], {}
+    for batch_no, start in enumerate(range(0, len(df), 70)):
+        batch = df.iloc[start : start + 70].reset_index(drop=True)
+        tables = summary_by_month(batch.copy())
+        batches.append(tables if isinstance(tables, tuple) else (tables,))
+        work_events.update_staff_order(staff_order, batch, role, batch_no)
+
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    for tables, expected_table in zip(zip(*batches), expected):
+        pd.testing.assert_frame_equal(utils.combine_month_wise_tables(list(tables), staff_order), expected_table)
+
+
+def test_yearly_summary_tables_build_the_work_events_once(monkeypatch, make_frame):
+    import yearly_performance_points
+
+    df = make_frame()
+    build_work_events = work_events.build_work_events
+    calls = []
+    monkeypatch.setattr(work_events, "build_work_events", lambda df: calls.append(1) or build_work_events(df))
+    months = [(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-31")), (pd.Timestamp("2024-02-01"), pd.Timestamp("2024-02-29"))]
+
+    data = yearly_performance_points.calculate_yearly_summary_tables(df, months, {}, [])
+    assert len(calls) == 1
+
+    events = build_work_events(df)
+    with_events = yearly_performance_points.calculate_yearly_summary_tables(df, months, {}, [], events=events)
+    assert len(calls) == 1
+    for month, tables in data.items():
+        for table, expected in zip(with_events[month], tables):
+            pd.testing.assert_frame_equal(table, expected)
@@ -0,0 +1,237 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+import utils
+
+
+def test_build_read_schema_includes_legacy_columns():
+    usecols, dtype = utils.build_read_schema()
+    assert set(config.COLS_TO_EXPECT_IN_CSV) <= usecols
+    assert "Unmerge (Start)" in usecols
+    assert dtype["Samples & Reshoot"] == dtype[config.COL_SAMPLES_RESTAKE] == "float64"
+
+
+def test_build_check_schema_reads_only_name_version_and_dates():
+    usecols, dtype = utils.build_check_schema()
+    assert {config.COL_PROJECT_NAME, config.COL_JOBSHEET_FILEVERSION} | set(config.DATE_COLS) <= usecols
+    assert config.COL_RENAME not in usecols
+    assert set(dtype.values()) == {str}
+
+
+def test_read_csv_with_schema_prunes_columns_and_keeps_header(tmp_path):
+    csv_path = tmp_path / "a.csv"
+    pd.DataFrame({config.COL_RENAME: [1, None], "Notes": ["x", "y"], "Unmerge (Start)": ["CV", None]}).to_csv(csv_path, index=False)
+
+    df = utils.read_csv_with_schema(str(csv_path), utils.build_read_schema())
+
+    assert df.columns.tolist() == [config.COL_RENAME, "Unmerge (Start)"]
+    assert df[config.COL_RENAME].dtype == "float64"
+    assert df.attrs["source_columns"] == [config.COL_RENAME, "Notes", "Unmerge (Start)"]
+
+
+def test_read_csv_with_schema_falls_back_on_text_in_counters(tmp_path):
+    csv_path = tmp_path / "a.csv"
+    pd.DataFrame({config.COL_RENAME: ["1", "abc"]}).to_csv(csv_path, index=False)
+
+    df = utils.read_csv_with_schema(str(csv_path), utils.build_read_schema())
+
+    assert df[config.COL_RENAME].tolist() == ["1", "abc"]
+
+
+def test_read_csv_with_arrow_matches_schema_reader(tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "a.csv"
+    pd.DataFrame({config.COL_RENAME: [1, None], "Notes": ["x", "y"], config.COL_WARNINGS: [None, "REVIEW RETOUCHER: x"]}).to_csv(csv_path, index=False)
+
+    df = utils.read_csv_with_arrow(str(csv_path), utils.build_read_schema())
+
+    assert df.columns.tolist() == [config.COL_RENAME, config.COL_WARNINGS]
+    assert isinstance(df[config.COL_WARNINGS].dtype, pd.ArrowDtype)
+    assert df[config.COL_WARNINGS].str.contains(config.REVIEW_RETOUCHER).any()
+    assert df.attrs["source_columns"] == [config.COL_RENAME, "Notes", config.COL_WARNINGS]
+
+
+def test_plan_ingestion_keeps_output_order_and_parses_largest_first(tmp_path):
+    sizes = {"b.csv": 30, "a.csv": 10, "z_archive.csv": 50}
+    for name, size in sizes.items():
+        (tmp_path / name).write_text("x" * size)
+    main_files = [str(tmp_path / "b.csv"), str(tmp_path / "a.csv")]
+    archive_files = [str(tmp_path / "z_archive.csv")]
+
+    ordered_files, parse_order = utils.plan_ingestion([main_files, archive_files])
+
+    assert [os.path.basename(f) for f in ordered_files] == ["a.csv", "b.csv", "z_archive.csv"]
+    assert parse_order == [2, 1, 0]
+
+
+def test_filter_data_files_rules(tmp_path):
+    names = ["xyz.csv", "xyz 5 Items.csv", "abc 3 Items.csv", "JOBSHEET_template.csv", "p (conflicted copy).csv", "other.csv"]
+    for n, name in enumerate(names):
+        path = tmp_path / name
+        path.write_text("a\n1")
+        os.utime(path, (1000 + n, 1000 + n))
+    all_files = [str(tmp_path / name) for name in names]
+
+    remaining, warnings = utils.filter_data_files(all_files)
+
+    # "xyz 5 Items.csv" is newer than "xyz.csv", a variant without its base file is kept
+    assert sorted(os.path.basename(f) for f in remaining) == ["abc 3 Items.csv", "other.csv", "xyz 5 Items.csv"]
+    assert "xyz.csv|||Skipped|||Duplicate" in warnings
+    assert "jobsheet_template.csv|||Skipped|||JOBSHEET_*" in warnings
+    assert "p (conflicted copy).csv|||Skipped|||Conflicted" in warnings
+
+
+def test_read_excel_sheets_cached_reuses_sheets_until_workbook_changes(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")
+    xlsx_path = str(tmp_path / "book.xlsx")
+    cache_path = str(tmp_path / "cache" / "sheets.pkl")
+    with pd.ExcelWriter(xlsx_path) as writer:
+        pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="one", index=False)
+        pd.DataFrame({"b": [2]}).to_excel(writer, sheet_name="two", index=False)
+
+    sheets, errors = utils.read_excel_sheets_cached(xlsx_path, ["one", "two"], cache_path)
+    assert errors == []
+    assert sheets["two"]["b"].tolist() == [2]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("workbook should not be opened again")
+
+    monkeypatch.setattr(utils, "read_excel_sheets", fail)
+    cached, errors = utils.read_excel_sheets_cached(xlsx_path, ["one", "two"], cache_path)
+    assert errors == []
+    assert cached["one"].equals(sheets["one"])
+
+
+def test_read_excel_sheets_reports_only_the_sheet_that_fails(tmp_path):
+    pytest.importorskip("openpyxl")
+    xlsx_path = str(tmp_path / "book.xlsx")
+    with pd.ExcelWriter(xlsx_path) as writer:
+        pd.DataFrame({"a": [1]}).to_excel(writer, sheet_name="one", index=False)
+        pd.DataFrame({"c": [3]}).to_excel(writer, sheet_name="three", index=False)
+
+    sheets, errors = utils.read_excel_sheets(xlsx_path, ["one", "missing", "three"])
+    assert len(errors) == 1
+    assert sheets["one"]["a"].tolist() == [1]
+    assert sheets["missing"].empty
+    assert sheets["three"]["c"].tolist() == [3]
+
+
+def test_iter_data_files_yields_files_in_output_order(tmp_path):
+    for name in ["b.csv", "a.csv"]:
+        pd.DataFrame({config.COL_PROJECT_NAME: [name]}).to_csv(tmp_path / name, index=False)
+    (tmp_path / "empty.csv").write_text("")
+    warnings = []
+
+    frames = utils.iter_data_files(
+        [str(tmp_path / name) for name in ["b.csv", "empty.csv", "a.csv"]], show_progress=False, warnings=warnings
+    )
+
+    assert [(os.path.basename(file), df[config.COL_PROJECT_NAME].tolist()) for file, df in frames] == [("a.csv", ["a.csv"]), ("b.csv", ["b.csv"])]
+    assert len(warnings) == 1
+
+
+def test_compressed_jobsheets_are_read_and_deduplicated(tmp_path):
+    import gzip
+
+    pytest.importorskip("pyarrow")
+    import pyarrow as pa
+
+    content = pd.DataFrame({config.COL_RENAME: [1, 2], "Notes": ["x", "y"]}).to_csv(index=False).encode()
+    (tmp_path / "a.csv.gz").write_bytes(gzip.compress(content))
+    with pa.output_stream(str(tmp_path / "b.csv.zst"), compression="zstd") as stream:
+        stream.write(content)
+    (tmp_path / "a.csv").write_bytes(content)
+    os.utime(tmp_path / "a.csv", (1000, 1000))
+
+    remaining, warnings = utils.filter_data_files([str(tmp_path / name) for name in ["a.csv", "a.csv.gz", "b.csv.zst"]])
+
+    assert sorted(os.path.basename(f) for f in remaining) == ["a.csv.gz", "b.csv.zst"]
+    assert "a.csv|||Skipped|||Duplicate" in warnings
+    for file in remaining:
+        for engine in ["pandas", "pyarrow"]:
+            df, warn = utils.read_csv_file(file, read_schema=utils.build_read_schema(), engine=engine)
+            assert not warn
+            assert df[config.COL_RENAME].tolist() == [1, 2]
+            assert df.attrs["source_columns"] == [config.COL_RENAME, "Notes"]
+
+
+def test_combine_month_wise_tables_adds_up_batches():
+    first = pd.DataFrame({"Feb-2024": [1.0], "Jan-2024": [2.0]}, index=pd.Index(["ann"], name="Items"))
+    second = pd.DataFrame({"Dec-2023": [5.0], "Jan-2024": [3.0]}, index=pd.Index(["bob"], name="Items"))
+
+    result = utils.combine_month_wise_tables([first, second])
+
+    assert result.columns.tolist() == ["Dec-2023", "Jan-2024", "Feb-2024"]
+    assert result.loc["ann"].tolist() == [0.0, 2.0, 1.0]
+    assert result.loc["bob"].tolist() == [5.0, 3.0, 0.0]
+    assert result.index.name == "Items"
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        ["05/01/2024", None, "05/01/2024", "31/12/2023", "2024-01-05", "not a date"],
+        ["2024-01-05", "2024-02-29", None, "05/01/2024"],
+        ["5 Jan 2024", "Jan 6, 2024", "07.01.2024"],
+        [None, None],
+    ],
+)
+def test_parse_date_column_matches_to_datetime(values):
+    series = pd.Series(values, dtype=object, name="Date")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        expected = pd.to_datetime(series, dayfirst=True, errors="coerce")
+    result = utils.parse_date_column(series)
+
+    pd.testing.assert_series_equal(result, expected)
+
+
+def test_parse_date_columns_parses_present_columns_in_order():
+    df = pd.DataFrame({config.DATE_COLS[1]: ["01/02/2024", None], config.DATE_COLS[0]: ["2024-03-04", "x"]})
+    parsed = utils.parse_date_columns(df, config.DATE_COLS)
+    assert list(parsed) == config.DATE_COLS[:2]
+    assert parsed[config.DATE_COLS[0]].isna().tolist() == [False, True]
+    assert parsed[config.DATE_COLS[1]].tolist()[0] == pd.Timestamp("2024-02-01")
+
+
+def test_add_provenance_tags_file_id_and_row():
+    df = pd.DataFrame({config.COL_PROJECT_NAME: ["a", "b", "c"]})
+    utils.add_provenance(df, 7)
+    assert df[config.COL_SOURCE_FILE_ID].tolist() == [7, 7, 7]
+    assert df[config.COL_SOURCE_ROW].tolist() == [0, 1, 2]
+    assert df[config.COL_SOURCE_ROW].dtype == "int32"
+
+
+def test_drop_duplicate_rows_keys_on_row_id():
+    df = pd.DataFrame({config.COL_PROJECT_NAME: ["a", "a", "b"]})
+    utils.add_provenance(df, 1)
+    df[config.COL_ROW_ID] = utils.get_row_ids(df)
+    assert df[config.COL_ROW_ID].tolist() == [2**32, 2**32 + 1, 2**32 + 2]
+
+    # the same rows picked up by two filters, identical lines of the file are kept apart
+    result = utils.drop_duplicate_rows(pd.concat([df.iloc[[0, 1]], df.iloc[[1, 2]]]))
+    assert result[config.COL_PROJECT_NAME].tolist() == ["a", "a", "b"]
+
+
+def test_build_project_table_has_one_row_per_project():
+    df = pd.DataFrame(
+        {
+            config.COL_PROJECT_NAME: ["2024.01.02 A", "2024.01.02 A", "B"],
+            "extracted_project_date": [pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-02"), pd.NaT],
+            config.COL_FILETAG: ["t1", "t1", "t2"],
+            config.COL_SOURCE_FILE_ID: np.array([1, 1, 0], dtype=np.int32),
+        }
+    )
+    projects = utils.build_project_table(df, ["b.csv", "a.csv"])
+    assert projects.index.tolist() == ["2024.01.02 A", "B"]
+    assert projects["source_file"].tolist() == ["a.csv", "b.csv"]
+
+    summary = pd.DataFrame({"Project_name": ["B", "2024.01.02 A"]})
+    utils.join_project_dates(summary, projects)
+    assert summary["extracted_project_date"].isna().tolist() == [True, False]
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+import config
+import summary_engine
+import work_events
+from summary_photographers import summary_of_photographers_all_projects
+
+
+def make_frame():
+    return pd.DataFrame(
+        {
+            config.COL_PROJECT_NAME: ["p1", "p1", "p2"],
+            config.COL_PHOTOGRAPHER_1: ["ann", "bob", "ann"],
+            config.COL_PHOTOGRAPHER_2: ["", "ann", "cv"],
+            config.COL_PHOTOGRAPHER_3: ["", "", ""],
+            config.COL_PHOTOGRAPHER_DATE: pd.to_datetime(["2024-01-02", "2024-01-03", "2024-02-01"]),
+            config.COL_RETOUCHERS_SIGN_1: ["cid", "", "cid"],
+            config.COL_DATE_DONE_RETOUCHERS_SIGN_1: pd.to_datetime(["2024-01-05", None, "2024-02-03"]),
+            config.COL_REJECT_RETOUCHERS_PAY: ["", "", "y"],
+            config.COL_WARNINGS: ["", "", config.REVIEW_RETOUCHER + " check"],
+            config.COL_PHOTOGRAPHY: [1.0, 2.0, 3.0],
+            config.COL_BESPOKE: [0.0, 1.0, 0.0],
+            config.COL_PHOTOGRAPHY_TO_VARIANCE: [0.0, 0.0, 0.0],
+            config.COL_SAMPLES_RESTAKE: [0.0, 0.0, 1.0],
+            config.COL_ROW_ID: np.array([10, 11, 12], dtype=np.int64),
+        }
+    )
+
+
+def test_events_are_one_per_signed_slot():
+    events = work_events.build_work_events(make_frame())
+
+    photographers = events[events["role"] == work_events.ROLE_PHOTOGRAPHER]
+    assert list(zip(photographers["slot"], photographers["staff"], photographers["row_id"])) == [
+        (1, "ann", 10),
+        (1, "bob", 11),
+        (1, "ann", 12),
+        (2, "ann", 11),
+        (2, "cv", 12),
+    ]
+    assert photographers["items"].tolist() == [1.0, 3.0, 4.0, 3.0, 4.0]
+
+    # rejected pay is not credited, the review marker is picked up per row
+    retouchers = events[events["role"] == work_events.ROLE_RETOUCHER]
+    assert retouchers["retouches"].tolist() == [1.0, 0.0]
+    assert retouchers["review"].tolist() == [False, True]
+    assert retouchers["date"].tolist() == [pd.Timestamp("2024-01-05"), pd.Timestamp("2024-02-03")]
+
+
+def test_photographer_totals_match_the_summary():
+    df = make_frame()
+    events = work_events.build_work_events(df)
+    photographers = events[(events["role"] == work_events.ROLE_PHOTOGRAPHER) & ~events["staff"].isin(config.UNMERGE_START_CONST_VALUES)]
+
+    totals = photographers.groupby("staff", sort=False).agg(Items=("items", "sum"), Images=("items", lambda x: (x > 0).sum()))
+    expected = summary_of_photographers_all_projects(df, True, None, None)
+    assert totals["Items"].tolist() == expected["Items"].tolist()
+    assert totals["Images"].tolist() == expected["Images"].tolist()
+
+
+def test_frame_without_signed_slots_gives_typed_empty_events():
+    df = make_frame()
+    df[config.PHOTOGRAPHER_SIGN_COLS + [config.COL_RETOUCHERS_SIGN_1]] = ""
+
+    events = work_events.build_work_events(df)
+
+    assert events.empty and events.columns.tolist() == work_events.EVENT_COLS
+    assert events["date"].dtype == "datetime64[ns]" and events["row_id"].dtype == np.int64
+    assert all(events[counter].dtype == float for counter in work_events.COUNTER_COLS)
+    assert summary_engine.photographers_by_period(df, "month", events).empty
+    assert summary_engine.retouchers_by_period(df, "month", events)[0].empty
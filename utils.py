@@ -1,13 +1,24 @@
+import csv
 import datetime as dt
+import hashlib
+import io
 import os
+import pickle
 import re
 import traceback
+import warnings
 from calendar import monthrange
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+from pandas.tseries.api import guess_datetime_format
 
 import config
+from file_catalog import FileCatalog
+from schema_registry import SchemaRegistry, compile_column_mapping
 
 
 def catch_errors(func):
@@ -110,84 +121,493 @@ def read_excel_file(excel_filepath, sheet_name=None):
     return df, errors
 
 
-def read_csv_file(csv_filepath, dayfirst=False, date_parser=None):
+def get_excel_reader_engine(engine="auto"):
+    """Use the calamine reader when python-calamine is installed, else pandas' default (openpyxl)"""
+    if engine != "auto":
+        return engine
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return None
+    return "calamine"
+
+
+def read_excel_sheets(excel_filepath, sheet_names, engine=None):
+    """
+    Open the workbook once and read all the requested sheets from it.
+    Each sheet is read on its own, a sheet that fails is reported and left empty without affecting the others
+    """
+    dfs = {sheet_name: pd.DataFrame() for sheet_name in sheet_names}
+    errors = []
+
+    def report(e):
+        msg = f'Unable to read data from excel "{excel_filepath}" --> "{e}"'
+        print(msg, "\n")
+        errors.append(msg)
+
+    try:
+        with pd.ExcelFile(excel_filepath, engine=engine) as xls:
+            for sheet_name in sheet_names:
+                try:
+                    dfs[sheet_name] = xls.parse(sheet_name)
+                except Exception as e:
+                    report(e)
+    except Exception as e:
+        # the workbook itself can't be opened, every sheet fails as it did when they were read one by one
+        for _ in sheet_names:
+            report(e)
+    return dfs, errors
+
+
+def read_excel_sheets_cached(excel_filepath, sheet_names, cache_filepath, engine=None):
+    """
+    Same as read_excel_sheets, but the parsed sheets are pickled next to the other intermediate files
+    and reused as long as the workbook's size and mtime are unchanged. Saving the workbook, as the KPI button
+    does before every run, invalidates the cache.
+    """
+    try:
+        stat = os.stat(excel_filepath)
+    except OSError:
+        return read_excel_sheets(excel_filepath, sheet_names, engine)
+
+    cache_key = (stat.st_size, stat.st_mtime_ns, tuple(sheet_names))
+    try:
+        with open(cache_filepath, "rb") as f:
+            cached = pickle.load(f)
+        if cached["key"] == cache_key:
+            print("Using cached configuration sheets")
+            return cached["sheets"], []
+    except Exception:
+        pass
+
+    dfs, errors = read_excel_sheets(excel_filepath, sheet_names, engine)
+    if not errors:
+        try:
+            os.makedirs(os.path.dirname(cache_filepath), exist_ok=True)
+            with open(cache_filepath, "wb") as f:
+                pickle.dump({"key": cache_key, "sheets": dfs}, f)
+        except Exception as e:
+            print(f"Unable to cache configuration sheets --> {e}")
+    return dfs, errors
+
+
+def build_read_schema():
+    """
+    Build the columns to read and their dtypes from the column lists in config.
+    Legacy column names get the dtype of the column they are renamed to.
+    """
+    dtype = {}
+    for col in config.COLS_TO_LOWER_CASE + config.STRING_COLS + config.DATE_COLS:
+        dtype[col] = str
+    for col in config.INTEGER_COLS:
+        dtype[col] = "float64"
+
+    for old_col, new_col in config.BACKWARD_COLUMN_COMPATIBILITY.items():
+        if new_col in dtype:
+            dtype[old_col] = dtype[new_col]
+
+    usecols = set(config.COLS_TO_EXPECT_IN_CSV) | set(config.BACKWARD_COLUMN_COMPATIBILITY)
+    return usecols, dtype
+
+
+def build_check_schema():
+    """Only what the --check mode needs: the project name, jobsheet version and date columns, as text"""
+    cols = {config.COL_PROJECT_NAME, config.COL_JOBSHEET_FILEVERSION} | set(config.DATE_COLS)
+    usecols = cols | {old_col for old_col, new_col in config.BACKWARD_COLUMN_COMPATIBILITY.items() if new_col in cols}
+    return usecols, {col: str for col in usecols}
+
+
+def get_reader_key(read_schema=None, engine="pandas"):
+    """Identify the reader settings, so cached frames are not reused once they change"""
+    if read_schema is None:
+        return f"{engine}-default"
+    usecols, dtype = read_schema
+    schema_repr = repr((sorted(usecols), sorted((col, str(t)) for col, t in dtype.items())))
+    return f"{engine}-schema-" + hashlib.sha1(schema_repr.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def open_csv_source(csv_filepath):
+    """
+    What to hand to pd.read_csv for a data file. pandas decompresses .csv.gz itself while it parses,
+    .csv.zst is streamed through pyarrow's zstd decoder so the zstandard package is not needed.
+    """
+    if csv_filepath.lower().endswith(".zst"):
+        import pyarrow as pa
+
+        with pa.input_stream(csv_filepath, compression="zstd") as stream:
+            yield stream
+    else:
+        yield csv_filepath
+
+
+def read_csv_with_schema(csv_filepath, read_schema):
+    """
+    Read only the schema columns with their dtypes set up front.
+    The full header is kept in df.attrs["source_columns"] for the column mismatch checks.
+    """
+    usecols, dtype = read_schema
+    source_columns = {}
+
+    def keep_column(col):
+        source_columns[col] = None
+        return col in usecols
+
+    try:
+        with open_csv_source(csv_filepath) as source:
+            df = pd.read_csv(source, usecols=keep_column, dtype=dtype)
+    except ValueError:
+        # text in a counter column, read the counters untyped and let the preprocessing report it
+        dtype = {col: t for col, t in dtype.items() if t is str}
+        with open_csv_source(csv_filepath) as source:
+            df = pd.read_csv(source, usecols=keep_column, dtype=dtype)
+
+    df.attrs["source_columns"] = list(source_columns)
+    return df
+
+
+def read_csv_header(csv_filepath):
+    """First row of a data file, decompressing .csv.gz / .csv.zst on the fly"""
+    import pyarrow as pa
+
+    with pa.input_stream(csv_filepath, compression="detect") as stream:
+        with io.TextIOWrapper(stream, encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), [])
+
+
+def read_csv_with_arrow(csv_filepath, read_schema=None):
+    """
+    Read a csv with pyarrow's multithreaded reader into a frame with Arrow-backed columns,
+    so string operations in the preprocessing and summaries run as Arrow kernels.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    read_options = pa_csv.ReadOptions(use_threads=True)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+
+    source_columns = None
+    if read_schema is not None:
+        usecols, dtype = read_schema
+        source_columns = read_csv_header(csv_filepath)
+        include_columns = [col for col in source_columns if col in usecols]
+        convert_options.include_columns = include_columns
+        convert_options.column_types = {col: pa.string() if dtype[col] is str else pa.float64() for col in include_columns if col in dtype}
+
+    try:
+        table = pa_csv.read_csv(csv_filepath, read_options=read_options, convert_options=convert_options)
+    except pa.ArrowInvalid:
+        if read_schema is None:
+            raise
+        # text in a counter column, read the counters untyped and let the preprocessing report it
+        convert_options.column_types = {col: t for col, t in convert_options.column_types.items() if t == pa.string()}
+        table = pa_csv.read_csv(csv_filepath, read_options=read_options, convert_options=convert_options)
+
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    if source_columns is not None:
+        df.attrs["source_columns"] = source_columns
+    return df
+
+
+def read_csv_file(csv_filepath, dayfirst=False, date_parser=None, read_schema=None, engine="pandas"):
     msg = ""
     df = pd.DataFrame()
     try:
-        df = pd.read_csv(csv_filepath, dayfirst=dayfirst, date_parser=date_parser)
+        if engine == "pyarrow":
+            df = read_csv_with_arrow(csv_filepath, read_schema)
+        elif read_schema is None:
+            with open_csv_source(csv_filepath) as source:
+                df = pd.read_csv(source, dayfirst=dayfirst, date_parser=date_parser)
+        else:
+            df = read_csv_with_schema(csv_filepath, read_schema)
     except Exception as e:
         msg = f"Unreadable csv '{os.path.basename(csv_filepath)}'|||Error->{e}"
         print(msg)
     return df, msg
 
 
+def read_preprocessed_parquet(parquet_filepath, dtype_backend=None):
+    """
+    Read back a preprocessed frame written to parquet, with the dtypes the csv reader of dtype_backend gave it.
+    The parquet metadata turns the Arrow strings of the pyarrow engine into StringDtype, which become object when
+    concatenated with a freshly read file. The other columns keep their preprocessed dtypes (categorical names,
+    numpy dates), a plain dtype_backend="pyarrow" read would change those too.
+    """
+    df = pd.read_parquet(parquet_filepath)
+    if dtype_backend == "pyarrow":
+        import pyarrow as pa
+
+        df = df.astype({col: pd.ArrowDtype(pa.string()) for col in df.select_dtypes("string").columns})
+    return df
+
+
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
 from time import time
 from typing import Callable, List, Optional, Tuple
 
 
-def read_data_files(
+def plan_ingestion(file_path_lists, catalog: FileCatalog = None):
+    """
+    Merge several file lists (e.g. main and archive folders) into one ingestion plan.
+    Output order: each list sorted by name, lists in the given order.
+    Parse order: largest file first, so the pool doesn't end up waiting on one big file.
+    """
+    ordered_files = [file for file_path_list in file_path_lists for file in sorted(file_path_list)]
+
+    if catalog is None:
+        catalog = FileCatalog()
+    catalog.add_paths(ordered_files)
+    sizes = [catalog.size(file) for file in ordered_files]
+
+    parse_order = sorted(range(len(ordered_files)), key=lambda i: sizes[i], reverse=True)
+    return ordered_files, parse_order
+
+
+def parse_data_file(file, dayfirst=False, date_parser=None, read_schema=None, engine="pandas"):
+    """Read one jobsheet and apply the backward column mapping. Runs inside the ingestion pool."""
+    df, warn = read_csv_file(file, dayfirst, date_parser, read_schema, engine)
+    if warn:
+        return df, warn
+
+    # the header as exported, for the column checks after the rename
+    df.attrs.setdefault("source_columns", df.columns.tolist())
+
+    rename_map = compile_column_mapping(tuple(df.columns))
+    if rename_map:
+        df.rename(columns=rename_map, inplace=True)
+    return df, warn
+
+
+def get_work_date_range(df: pd.DataFrame):
+    """Earliest and latest date over the DATE_COLS of a preprocessed frame, NaT when it holds no dated work"""
+    date_cols = [col for col in config.DATE_COLS if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col])]
+    if not date_cols or df.empty:
+        return pd.NaT, pd.NaT
+    return df[date_cols].min().min(), df[date_cols].max().max()
+
+
+@lru_cache(maxsize=4096)
+def guess_date_format(value: str, dayfirst: bool = True) -> Optional[str]:
+    """strftime format of a date string, memoized as a jobsheet version writes the same few formats"""
+    return guess_datetime_format(value, dayfirst=dayfirst)
+
+
+def parse_date_column(series: pd.Series, dayfirst: bool = True) -> pd.Series:
+    """
+    Same result as pd.to_datetime(series, dayfirst=dayfirst, errors="coerce"), but each distinct value is parsed
+    once with the explicit format of the file (taken from its first date, as pandas does) and mapped back.
+    Invalid dates come out as NaT.
+    """
+    codes, uniques = pd.factorize(series)
+    first = next((val for val in uniques if isinstance(val, str)), None)
+    date_format = guess_date_format(first, dayfirst) if first is not None else None
+
+    with warnings.catch_warnings():
+        # no format could be told, the values are parsed one by one, as pd.to_datetime would
+        warnings.simplefilter("ignore", UserWarning)
+        parsed = pd.to_datetime(uniques, format=date_format, dayfirst=dayfirst, errors="coerce")
+    if not pd.api.types.is_datetime64_dtype(parsed):
+        # e.g. timezone aware values, left to pandas
+        return pd.to_datetime(series, dayfirst=dayfirst, errors="coerce")
+
+    # code -1 (missing value) picks the NaT appended at the end
+    values = np.append(parsed.values, np.datetime64("NaT", "ns").astype(parsed.dtype))[codes]
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def parse_date_columns(df: pd.DataFrame, cols, dayfirst: bool = True, max_workers: Optional[int] = None) -> dict:
+    """Parse the date columns present in df concurrently. Column --> parsed series, or the exception it raised"""
+
+    def parse(col):
+        try:
+            return parse_date_column(df[col], dayfirst)
+        except Exception as e:
+            return e
+
+    cols = [col for col in cols if col in df.columns]
+    if max_workers == 1 or len(cols) < 2:
+        return {col: parse(col) for col in cols}
+    with ThreadPoolExecutor(max_workers=max_workers or len(cols)) as executor:
+        return dict(zip(cols, executor.map(parse, cols)))
+
+
+def add_provenance(df: pd.DataFrame, file_id: int):
+    """Tag the rows of a freshly read data file with its source file ID and their row number in the file"""
+    df[config.COL_SOURCE_FILE_ID] = np.full(len(df), file_id, dtype=np.int32)
+    df[config.COL_SOURCE_ROW] = np.arange(len(df), dtype=np.int32)
+
+
+def get_row_ids(df: pd.DataFrame) -> np.ndarray:
+    """Stable row IDs from the provenance columns: source file ID in the high 32 bits, row number in the low ones"""
+    return (df[config.COL_SOURCE_FILE_ID].to_numpy(np.int64) << 32) | df[config.COL_SOURCE_ROW].to_numpy(np.int64)
+
+
+def drop_duplicate_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count once the rows picked up by more than one filter. Keyed on the row ID when the frame has it, instead of
+    hashing every column, and identical lines of a jobsheet are not collapsed.
+    """
+    if config.COL_ROW_ID in df.columns:
+        return df[~df[config.COL_ROW_ID].duplicated()]
+    return df.drop_duplicates()
+
+
+def build_project_table(df: pd.DataFrame, source_files=None) -> pd.DataFrame:
+    """
+    One row per project, indexed by project name: the project date, filetag, jobsheet version and source file
+    of its first row. Project-wise summaries join against it instead of scanning the frame for each output row.
+    """
+    cols = [col for col in ["extracted_project_date", config.COL_FILETAG, config.COL_JOBSHEET_FILEVERSION, config.COL_SOURCE_FILE_ID] if col in df.columns]
+    projects = df.drop_duplicates(subset=config.COL_PROJECT_NAME).set_index(config.COL_PROJECT_NAME)[cols]
+    if source_files is not None and config.COL_SOURCE_FILE_ID in projects.columns:
+        projects["source_file"] = np.asarray(source_files, dtype=object)[projects.pop(config.COL_SOURCE_FILE_ID).to_numpy()]
+    return projects
+
+
+def join_project_dates(df_project_wise: pd.DataFrame, projects: pd.DataFrame):
+    """Add the extracted_project_date of each Project_name of a project-wise summary, from the project table"""
+    df_project_wise["extracted_project_date"] = df_project_wise["Project_name"].map(projects["extracted_project_date"])
+
+
+def get_header_layout_key(df: pd.DataFrame):
+    """The header as exported and the jobsheet version of a parsed data file"""
+    source_cols = df.attrs.get("source_columns", df.columns.tolist())
+    version = "?"
+    if config.COL_JOBSHEET_FILEVERSION in df.columns and len(df):
+        version = df[config.COL_JOBSHEET_FILEVERSION].iloc[0]
+    return source_cols, version
+
+
+def iter_data_files(
     file_path_list,
     dayfirst=False,
     date_parser=None,
     colsExpected: list = [],
     use_threads: bool = True,
     show_progress: bool = True,
+    parse_cache=None,
+    read_schema=None,
+    engine: str = "pandas",
+    archive_file_path_list=(),
+    max_workers: int = None,
+    use_processes: bool = False,
+    process_min_files: int = 0,
+    catalog: FileCatalog = None,
+    schema_registry: SchemaRegistry = None,
+    warnings: list = None,
 ):
+    """
+    Yield (file path, df) for every readable data file, in output order, as soon as it is parsed.
+    Files that cannot be read are reported in warnings. The pool keeps parsing the next files
+    while the caller works on the current one.
+    """
+    if warnings is None:
+        warnings = []
+    if catalog is None:
+        catalog = FileCatalog()
+    if schema_registry is None:
+        schema_registry = SchemaRegistry(colsExpected)
+    file_path_list, parse_order = plan_ingestion([file_path_list, archive_file_path_list], catalog)
+    parse_args = (dayfirst, date_parser, read_schema, engine)
+
+    # only files without an up to date cache entry go to the pool
+    cached_files = {}
+    to_parse = []
+    for i in parse_order:
+        file = file_path_list[i]
+        cache_file = parse_cache.lookup(file, catalog.stat(file)) if parse_cache is not None else None
+        if cache_file is not None:
+            cached_files[i] = cache_file
+        else:
+            to_parse.append(i)
+
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, len(to_parse)))
+    if not use_threads or not to_parse:
+        executor = None
+    elif use_processes and len(to_parse) >= process_min_files:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    print(f"Starting to read files ({engine} engine, {len(to_parse)} to parse, {len(cached_files)} cached)...")
+    start_time = time()
+    n_files = 0
+
+    with executor if executor is not None else nullcontext():
+        parse_jobs = {}
+        if executor is not None:
+            parse_jobs = {i: executor.submit(parse_data_file, file_path_list[i], *parse_args) for i in to_parse}
+
+        def read_and_process(i):
+            file = file_path_list[i]
+            filename = os.path.basename(file)
+
+            if i in cached_files:
+                df = parse_cache.read(cached_files[i])
+                if df is not None:
+                    return filename, df, ""
+
+            job = parse_jobs.get(i)
+            df, warn = job.result() if job is not None else parse_data_file(file, *parse_args)
+
+            if not warn and parse_cache is not None:
+                parse_cache.store(file, df, catalog.stat(file))
+            return filename, df, warn
+
+        jobs = map(read_and_process, range(len(file_path_list)))
+
+        if show_progress:
+            from tqdm import tqdm
+
+            jobs = tqdm(jobs, total=len(file_path_list), desc="Reading CSV files")
+
+        for i, (filename, temp_df, warn) in enumerate(jobs):
+            print(f"{i}. Reading: {filename}")
+            if warn:
+                warnings.append(warn)
+                continue
 
-    errors: list[str] = []
-    df_lens: list[int] = []
-    df_src_filenames: list[str] = []
-    warnings: list[str] = []
-    file_path_list = sorted(file_path_list)
-    df_list = []
-
-    def read_and_process(file):
-        filename = os.path.basename(file)
-        df, warn = read_csv_file(file, dayfirst, date_parser)
-        return filename, df, warn
-
-    print("Starting to read files...")
-    reader = ThreadPoolExecutor().map if use_threads else map
-    jobs = reader(read_and_process, file_path_list)
-
-    if show_progress:
-        from tqdm import tqdm
-
-        jobs = tqdm(jobs, total=len(file_path_list), desc="Reading CSV files")
-    
-    for i, (filename, temp_df, warn) in enumerate(jobs):
-        print(f"{i}. Reading: {filename}")
-        if warn:
-            warnings.append(warn)
-            continue
+            # files are batched by header layout, the column checks run once per layout
+            schema_registry.register(*get_header_layout_key(temp_df), filename)
 
-        original_cols = temp_df.columns.tolist()
+            n_files += 1
+            yield file_path_list[i], temp_df
 
-        # Apply backward mapping if needed
-        mapped_cols = [config.BACKWARD_COLUMN_COMPATIBILITY.get(col, col) for col in original_cols]
+    if colsExpected:
+        warnings.extend(schema_registry.mismatch_warnings())
+    print(f"{n_files} file(s) in {len(schema_registry.files_by_layout)} header layout(s)")
 
-        # If mapping changed, rename the columns in the DataFrame
-        if mapped_cols != original_cols:
-            temp_df.rename(columns=config.BACKWARD_COLUMN_COMPATIBILITY, inplace=True)
+    if parse_cache is not None:
+        parse_cache.save()
 
-        # Check if mapped columns match expected
-        if colsExpected and mapped_cols != colsExpected:
-            extra = list(set(mapped_cols) - set(colsExpected))
-            missing = list(set(colsExpected) - set(mapped_cols))
-            version = temp_df.get("jobsheet_fileversion", pd.Series(["?"])).iloc[0]
-            warnings.append(
-                f'Check "{filename}" --> Columns mismatch. Extra: "{extra}". Missing: "{missing}". jobsheet version: {version}'
-            )
+    print(f"Read {n_files} file(s) in {time() - start_time:.2f} seconds")
 
-        df_list.append(temp_df)
-        df_lens.append(len(temp_df))
-        df_src_filenames.append(filename)
 
-    final_df = pd.concat(df_list, ignore_index=True)
+def combine_month_wise_tables(tables: List[pd.DataFrame], staff_order: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Add up month-wise tables (staff x period, or x "Mon-YYYY" from the loop engine) computed on separate batches of rows.
+    Staff rows are sorted on staff_order (see work_events.update_staff_order) as in a table of all the rows, or kept in
+    order of first appearance across the batches. Zero where a batch has no work, integer counts stay integers.
+    """
+    names = list(dict.fromkeys(name for table in tables for name in table.index))
+    if staff_order is not None:
+        names.sort(key=lambda name: staff_order[name])
+
+    if isinstance(tables[0].columns, pd.PeriodIndex):
+        columns = tables[0].columns
+        for table in tables[1:]:
+            columns = columns.union(table.columns)
+        columns = columns.sort_values()
+    else:
+        columns = sorted(set().union(*(table.columns for table in tables)), key=lambda x: pd.to_datetime("01-" + x))
 
-    return final_df, errors, warnings, df_lens, df_src_filenames
+    result = tables[0].reindex(index=names, columns=columns, fill_value=0)
+    for table in tables[1:]:
+        result = result + table.reindex(index=names, columns=columns, fill_value=0)
+    result.index.name = tables[0].index.name
+    return result
 
 
 def multiple_dfs_on_same_sheet(writer, df_list: list[pd.DataFrame], sheet_name: str, spaces: int, row: int, index: bool = True):
@@ -252,22 +672,17 @@ def write_to_file(filepath, msg_list):
         f.write(msg)
 
 
-def get_filename_and_row(row, df_lens, df_src_filenames):
-    len_sum = 0
-    for df_len, filename in zip(df_lens, df_src_filenames):
-        len_sum = len_sum + df_len
-        if row < len_sum:
-            return filename, row - (len_sum - df_len)
-
-
 # @handle_errors(default_return="Something went wrong!")
-def filter_data_files(all_kpi_files):
+def filter_data_files(all_kpi_files, catalog: FileCatalog = None):
     warnings = []
+    if catalog is None:
+        catalog = FileCatalog()
+    all_kpi_files = catalog.add_paths(all_kpi_files)
     remaining_files = set(all_kpi_files)
 
     for file_path in all_kpi_files:
 
-        filename: str = os.path.basename(file_path).lower()
+        filename: str = catalog.get(file_path).name.lower()
 
         # Rule 1: Skip conflicted files
         if "conflicted" in filename.lower():
@@ -283,25 +698,51 @@ def filter_data_files(all_kpi_files):
             continue
 
     # Rule 3: Handle duplicates like 'xyz 5 Items.xlsx' vs 'xyz.xlsx'
-    remaining_files = remove_duplicate_files(remaining_files, warnings)
+    remaining_files = remove_duplicate_files(remaining_files, warnings, catalog)
     return remaining_files, warnings
 
 
-def remove_duplicate_files(remaining_files: set, warnings: list) -> list:
-    remaining_file_list = list(remaining_files)
+DUPLICATE_ITEMS_SUFFIX_PATTERN = re.compile(r" \d+ Items\.")
 
-    for base_file in remaining_file_list:
-        base_stem = Path(base_file).stem
 
-        for other_file in remaining_file_list:
-            if base_file == other_file:
-                continue
+def remove_duplicate_files(remaining_files: set, warnings: list, catalog: FileCatalog = None) -> list:
+    """
+    Pair every 'BaseName 3 Items.csv' with 'BaseName.csv' through a stem lookup and keep the newer file of each pair.
+    Plain and compressed variants share a stem, so they are paired the same way.
+    """
+    if catalog is None:
+        catalog = FileCatalog()
+        catalog.add_paths(remaining_files)
+
+    files_by_stem = {}
+    for file_path in sorted(remaining_files):
+        files_by_stem.setdefault(catalog.get(file_path).stem, []).append(file_path)
+
+    # Plain and compressed exports of the same jobsheet ('xyz.csv' vs 'xyz.csv.gz'), keep the newest
+    for stem, file_paths in files_by_stem.items():
+        if len(file_paths) < 2:
+            continue
+        to_keep = max(file_paths, key=lambda file_path: catalog.get(file_path).mtime)
+        warnings.append(f"{os.path.basename(to_keep)}|||Scanned|||Duplicate")
+        for to_remove in file_paths:
+            if to_remove != to_keep:
+                warnings.append(f"{os.path.basename(to_remove)}|||Skipped|||Duplicate")
+                remaining_files.discard(to_remove)
+        files_by_stem[stem] = [to_keep]
+
+    for other_file in sorted(remaining_files):
+        other_entry = catalog.get(other_file)
+
+        # Match pattern like "BaseName 3 Items.xlsx", the base stem is everything before " 3 Items."
+        base_stems = {other_entry.name[: m.start()] for m in DUPLICATE_ITEMS_SUFFIX_PATTERN.finditer(other_entry.name)}
+
+        for base_stem in base_stems:
+            for base_file in files_by_stem.get(base_stem, []):
+                if base_file == other_file:
+                    continue
 
-            other_name = os.path.basename(other_file)
-            # Match pattern like "BaseName 3 Items.xlsx"
-            if re.match(rf"^{re.escape(base_stem)} \d+ Items\.", other_name):
                 # Keep the newer file
-                if os.path.getmtime(base_file) > os.path.getmtime(other_file):
+                if catalog.get(base_file).mtime > other_entry.mtime:
                     to_keep, to_remove = base_file, other_file
                 else:
                     to_keep, to_remove = other_file, base_file
@@ -0,0 +1,146 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import config
+
+ROLE_PHOTOGRAPHER = "photographer"
+ROLE_PHOTOSTACKER = "photostacker"
+ROLE_RETOUCHER = "retoucher"
+
+# sign column and work date column of every slot of a role, photographers share one date
+ROLE_SLOTS: Dict[str, List[Tuple[str, str]]] = {
+    ROLE_PHOTOGRAPHER: [(col, config.COL_PHOTOGRAPHER_DATE) for col in config.PHOTOGRAPHER_SIGN_COLS],
+    ROLE_PHOTOSTACKER: list(zip(config.PHOTOSTACKER_SIGN_COLS, [config.COL_PHOTOSTACKER_DATE_1, config.COL_PHOTOSTACKER_DATE_2])),
+    ROLE_RETOUCHER: list(
+        zip(
+            config.RETOUCHER_SIGN_COLS,
+            [
+                config.COL_DATE_DONE_RETOUCHERS_SIGN_1,
+                config.COL_DATE_DONE_RETOUCHERS_SIGN_2,
+                config.COL_DATE_DONE_RETOUCHERS_SIGN_3,
+                config.COL_DATE_DONE_RETOUCHERS_SIGN_4,
+                config.COL_DATE_DONE_RETOUCHERS_SIGN_5,
+            ],
+        )
+    ),
+}
+
+# counters credited to the staff of each role, and the datasheet columns they add up
+ROLE_COUNTERS: Dict[str, Dict[str, List[str]]] = {
+    ROLE_PHOTOGRAPHER: {
+        "items": [config.COL_PHOTOGRAPHY, config.COL_BESPOKE, config.COL_PHOTOGRAPHY_TO_VARIANCE, config.COL_SAMPLES_RESTAKE],
+    },
+    ROLE_PHOTOSTACKER: {
+        "rename": [config.COL_RENAME],
+        "adjust": [config.COL_ADJUST],
+        "photostack": [config.COL_PHOTOSTACK],
+    },
+    ROLE_RETOUCHER: {
+        "transfer": [config.COL_TRANSFER],
+        "retouches": [config.COL_PHOTOGRAPHY, config.COL_BESPOKE, config.COL_SUPERIMPOSE, config.COL_SAMPLES_RESTAKE],
+        "variance": [config.COL_CAPPED, config.COL_PHOTOGRAPHY_TO_VARIANCE, config.COL_VARIANCE, config.COL_COMBINE],
+    },
+}
+
+# Warnings marker that flags a role's work for review
+ROLE_REVIEW_MARKERS = {ROLE_PHOTOSTACKER: config.REVIEW_PHOTOSTACKER, ROLE_RETOUCHER: config.REVIEW_RETOUCHER}
+
+COUNTER_COLS = list(dict.fromkeys(counter for counters in ROLE_COUNTERS.values() for counter in counters))
+EVENT_COLS = ["role", "slot", "staff", "date", "project", "row_id", "review"] + COUNTER_COLS
+
+
+def get_role_counters(df: pd.DataFrame, role: str) -> Dict[str, np.ndarray]:
+    """Per row counters of a role. Retouchers are not credited for rows whose pay was rejected"""
+    counters = {}
+    for counter, cols in ROLE_COUNTERS[role].items():
+        values = np.zeros(len(df))
+        for col in cols:
+            if col in df.columns:
+                values = values + df[col].to_numpy(dtype=float)
+        counters[counter] = values
+
+    if role == ROLE_RETOUCHER and config.COL_REJECT_RETOUCHERS_PAY in df.columns:
+        rejected = (df[config.COL_REJECT_RETOUCHERS_PAY] == "y").to_numpy()
+        for values in counters.values():
+            values[rejected] = 0
+    return counters
+
+
+def get_event_row_ids(df: pd.DataFrame) -> np.ndarray:
+    """Row IDs the events of df refer to, the row positions when df has no row ID column"""
+    return df[config.COL_ROW_ID].to_numpy() if config.COL_ROW_ID in df.columns else np.arange(len(df))
+
+
+def update_staff_order(staff_order: dict, df: pd.DataFrame, role: str, batch_no: int):
+    """
+    Record the first (slot, batch, position) each staff name of a role is signed at in the batch df. Sorted on it,
+    names come in the order of appearance of the tables built on all the batches at once: slot by slot, then row.
+    """
+    for slot, (sign_col, _) in enumerate(ROLE_SLOTS[role], start=1):
+        if sign_col not in df.columns:
+            continue
+        for position, name in enumerate(pd.unique(df[sign_col].astype(object))):
+            key = (slot, batch_no, position)
+            if key < staff_order.get(name, (np.inf,)):
+                staff_order[name] = key
+
+
+def get_empty_events() -> pd.DataFrame:
+    """Event table of a frame without any signed slot, with the dtypes the summaries rely on (e.g. .dt on date)"""
+    events = {
+        "role": pd.Categorical([], categories=list(ROLE_SLOTS)),
+        "slot": np.array([], dtype=np.int8),
+        "staff": pd.Series([], dtype=object),
+        "date": pd.Series([], dtype="datetime64[ns]"),
+        "project": pd.Series([], dtype=object),
+        "row_id": np.array([], dtype=np.int64),
+        "review": np.array([], dtype=bool),
+    }
+    for counter in COUNTER_COLS:
+        events[counter] = np.array([], dtype=float)
+    return pd.DataFrame(events)[EVENT_COLS]
+
+
+def build_work_events(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Who did what and when, in long format: one event per signed slot of a row (role, slot number, staff name,
+    the slot's work date, project and row ID) with the counters the role is credited with. Empty slots are left out,
+    the sentinel values (cv, na, to duplicate, ...) are kept for the summaries to skip as they need.
+    """
+    row_ids = get_event_row_ids(df)
+    events = []
+    for role, slots in ROLE_SLOTS.items():
+        counters = get_role_counters(df, role)
+        if role in ROLE_REVIEW_MARKERS and config.COL_WARNINGS in df.columns:
+            review = df[config.COL_WARNINGS].str.contains(ROLE_REVIEW_MARKERS[role], na=False).to_numpy()
+        else:
+            review = np.zeros(len(df), dtype=bool)
+
+        for slot, (sign_col, date_col) in enumerate(slots, start=1):
+            if sign_col not in df.columns:
+                continue
+            staff = df[sign_col]
+            signed = (staff.notna() & (staff != "")).to_numpy()
+            if not signed.any():
+                continue
+
+            event = {
+                "role": role,
+                "slot": np.int8(slot),
+                "staff": staff[signed].reset_index(drop=True),
+                "date": df[date_col][signed].reset_index(drop=True) if date_col in df.columns else pd.NaT,
+                "project": df[config.COL_PROJECT_NAME][signed].reset_index(drop=True),
+                "row_id": row_ids[signed],
+                "review": review[signed],
+            }
+            for counter in COUNTER_COLS:
+                event[counter] = counters[counter][signed] if counter in counters else 0.0
+            events.append(pd.DataFrame(event))
+
+    if not events:
+        return get_empty_events()
+    events = pd.concat(events, ignore_index=True)
+    events["role"] = events["role"].astype("category")
+    return events[EVENT_COLS]
@@ -1,6 +1,8 @@
 import pandas as pd
 import xlsxwriter
+import config
 import utils
+import work_events
 from summary_photographers import summary_of_photographers_project_wise
 from summary_photostackers import summary_of_photostackers_project_wise
 from summary_retouchers import summary_of_retouchers_project_wise
@@ -47,22 +49,27 @@ def date_list(start_date_obj, end_date_obj):
     return user_date_list
 
 
-def calculate_yearly_summary_tables(df, user_date_list, ppj_dict, sub_catg_list):
+def calculate_yearly_summary_tables(df, user_date_list, ppj_dict, sub_catg_list, projects=None, events=None):
     # needs to be calulated again as dates are diffrent here in Yearly performance points table
 
     data = {}
+    if projects is None:
+        projects = utils.build_project_table(df)
+    # built once for all the months, not by every call of the groupby engine
+    if events is None and config.SUMMARY_ENGINE == "groupby":
+        events = work_events.build_work_events(df)
 
     for user_start_date, user_end_date in user_date_list:
 
         month_year_str = utils.convert_date_obj_to_str(user_start_date, date_format="%b-%Y")
 
-        df_photographers_yearly_summ = summary_of_photographers_project_wise(df, user_start_date, user_end_date)
+        df_photographers_yearly_summ = summary_of_photographers_project_wise(df, user_start_date, user_end_date, projects, events)
         df_photographers_yearly_summ = utils.calc_KPI_from_PPJ(df_photographers_yearly_summ, ppj_dict, sub_catg_list)
 
-        df_photostackers_yearly_summ = summary_of_photostackers_project_wise(df, user_start_date, user_end_date)
+        df_photostackers_yearly_summ = summary_of_photostackers_project_wise(df, user_start_date, user_end_date, projects, events)
         df_photostackers_yearly_summ = utils.calc_KPI_from_PPJ(df_photostackers_yearly_summ, ppj_dict, sub_catg_list)
 
-        df_retouchers_yearly_summ = summary_of_retouchers_project_wise(df, user_start_date, user_end_date)
+        df_retouchers_yearly_summ = summary_of_retouchers_project_wise(df, user_start_date, user_end_date, projects, events)
         df_retouchers_yearly_summ = utils.calc_KPI_from_PPJ(df_retouchers_yearly_summ, ppj_dict, sub_catg_list)
 
         data[month_year_str] = [df_photographers_yearly_summ, df_photostackers_yearly_summ, df_retouchers_yearly_summ]